@@ -0,0 +1,266 @@
+import argparse
+import glob
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+'''
+크롤러 오프라인 벤치마크
+- 로컬 HTTP 서버가 albamon.com 대신 목록 API JSON / 상세 HTML fixture 를 응답 (지연, 지터, 429/5xx 주입)
+- crawling.py, combined_crawler.py, detail-brute-force-crawling.py 를 하위 프로세스로 실행해서
+  pages/sec, 요청 지연 p50/p99 (재시도 포함), CPU 시간, 최대 RSS 측정
+- 요청 주소는 http_client 의 CRAWLER_URL_REWRITE 로 로컬 서버로 돌리고, 지연시간은 CRAWLER_TRACE 로 수집
+- fixture 디렉토리 구성: list/<pageIndex>.json, detail/<talkNo>.html
+  (--record 로 실제 사이트에서 내려받거나, 비어 있으면 합성 fixture 생성)
+- --baseline 결과보다 pages/sec 가 --tolerance 이상 떨어지면 종료 코드 1 (CI 용)
+
+사용 예시:
+python bench_crawlers.py bench_fixtures --record --pages 5
+python bench_crawlers.py bench_fixtures --latency 0.05 --jitter 0.02 --rate-429 0.02 --output bench.json
+python bench_crawlers.py bench_fixtures --baseline bench.json
+'''
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+LIST_API_ORIGIN = "https://bff-albatalk.albamon.com"
+SITE_ORIGIN = "https://www.albamon.com"
+LIST_PATH = "/bff/talks"
+DETAIL_PATH = "/alba-talk/experience/"
+EMPTY_LIST = b'{"collection": []}'
+
+# {pages} 는 목록 fixture 페이지 수로 바뀜
+SCENARIOS = {
+    "crawling": ["crawling.py", "--start-page", "1", "--end-page", "{pages}"],
+    "crawling-async": ["crawling.py", "--async", "--min-interval", "0", "--start-page", "1", "--end-page", "{pages}"],
+    "combined": ["combined_crawler.py", "--last-page", "{pages}"],
+    "combined-pipeline": ["combined_crawler.py", "--last-page", "{pages}", "--pipeline"],
+    "detail-brute-force": ["detail-brute-force-crawling.py"],
+}
+
+
+def record_fixtures(fixture_dir, pages):
+    # 실제 사이트의 목록 API 응답과 그 게시글들의 상세 HTML 을 저장
+    import http_client
+    from crawling import TARGET_API_URL
+    from combined_crawler import BASE_URL
+
+    os.makedirs(os.path.join(fixture_dir, "list"), exist_ok=True)
+    os.makedirs(os.path.join(fixture_dir, "detail"), exist_ok=True)
+    for page in range(1, pages + 1):
+        response = http_client.fetch(f"{TARGET_API_URL}{page}")
+        with open(os.path.join(fixture_dir, "list", f"{page}.json"), 'wb') as f:
+            f.write(response.content)
+        for item in response.json().get("collection", []):
+            detail = http_client.fetch(f"{BASE_URL}/{item['talkNo']}?sortType=CREATED_DATE")
+            with open(os.path.join(fixture_dir, "detail", f"{item['talkNo']}.html"), 'wb') as f:
+                f.write(detail.content)
+        print(f"📥 목록 {page}페이지 저장")
+    http_client.close()
+
+
+def synthetic_fixtures(fixture_dir, pages, page_size=20, newest_talk_no=1000000, gap_every=7):
+    # 실제 페이지와 같은 클래스 이름(여러 클래스를 가진 태그 포함)을 쓰는 합성 fixture (gap_every 번째 talkNo 는 삭제된 글처럼 비워둠)
+    os.makedirs(os.path.join(fixture_dir, "list"), exist_ok=True)
+    os.makedirs(os.path.join(fixture_dir, "detail"), exist_ok=True)
+    padding = "<script>" + "x" * 50000 + "</script>"  # Next.js 페이지 크기 흉내
+    talk_no = newest_talk_no
+    for page in range(1, pages + 1):
+        collection = []
+        while len(collection) < page_size:
+            if talk_no % gap_every:
+                item = {"talkNo": talk_no, "title": f"제목 {talk_no}", "contents": f"내용 {talk_no} " * 20,
+                        "createdDate": "2025-01-01", "viewCount": talk_no % 1000, "replyCount": talk_no % 3}
+                collection.append(item)
+                comments = "".join(
+                    f'<li><p class="comment-list__text-override">댓글 {n}</p>'
+                    f'<p class="comment-list__detail-override">2025-01-02</p></li>' for n in range(item["replyCount"]))
+                html = (f'<html><body>{padding}'
+                        f'<h1 class="DetailTitle_detail__header--title__Bbp40 Typography_typography__h1">{item["title"]}</h1>'
+                        f'<div class="CommonInfos_info__wrapper__aGcEl Flex_flex__row"><div>익명</div><div>2025-01-01</div></div>'
+                        f'<span class="experience__span experience__span--view">{item["viewCount"]}</span>'
+                        f'<div class="Detail_content__content__hJ5M7">{item["contents"]}</div>'
+                        f'<div class="CommentList_comment-contents__YVrtF"><ul>{comments}</ul></div>'
+                        f'</body></html>')
+                with open(os.path.join(fixture_dir, "detail", f"{talk_no}.html"), 'w', encoding='utf-8') as f:
+                    f.write(html)
+            talk_no -= 1
+        with open(os.path.join(fixture_dir, "list", f"{page}.json"), 'w', encoding='utf-8') as f:
+            json.dump({"collection": collection}, f, ensure_ascii=False)
+    print(f"🧪 합성 fixture 생성: 목록 {pages}페이지, talkNo {newest_talk_no} ~ {talk_no + 1}")
+
+
+def load_fixtures(fixture_dir):
+    list_pages = {}
+    for path in glob.glob(os.path.join(fixture_dir, "list", "*.json")):
+        with open(path, 'rb') as f:
+            list_pages[int(os.path.basename(path)[:-5])] = f.read()
+    details = {}
+    for path in glob.glob(os.path.join(fixture_dir, "detail", "*.html")):
+        with open(path, 'rb') as f:
+            details[int(os.path.basename(path)[:-5])] = f.read()
+    return list_pages, details
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (크롤러의 커넥션 재사용까지 측정)
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        roll = random.random()
+        if roll < server.rate_429:
+            return self._send(429, b"", "text/plain", {"Retry-After": "0"})
+        if roll < server.rate_429 + server.rate_5xx:
+            return self._send(503, b"", "text/plain")
+
+        url = urlparse(self.path)
+        if url.path == LIST_PATH:
+            page = int(parse_qs(url.query).get("pageIndex", ["1"])[0])
+            return self._send(200, server.list_pages.get(page, EMPTY_LIST), "application/json; charset=utf-8")
+        if url.path.startswith(DETAIL_PATH):
+            talk_no = url.path[len(DETAIL_PATH):]
+            body = server.details.get(int(talk_no)) if talk_no.isdigit() else None
+            if body is not None:
+                return self._send(200, body, "text/html; charset=utf-8")
+        return self._send(404, b"<html><body></body></html>", "text/html; charset=utf-8")
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(list_pages, details, latency, jitter, rate_429, rate_5xx):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReplayHandler)
+    server.daemon_threads = True
+    server.list_pages, server.details = list_pages, details
+    server.latency, server.jitter = latency, jitter
+    server.rate_429, server.rate_5xx = rate_429, rate_5xx
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_scenario(name, argv, port, crawler_rate):
+    # 상태 파일(high-water mark, 저널, 인덱스)이 섞이지 않도록 시나리오마다 빈 작업 디렉토리에서 실행
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as workdir:
+        trace_file = os.path.join(workdir, "trace.tsv")
+        env = {
+            **os.environ,
+            "CRAWLER_URL_REWRITE": f"{LIST_API_ORIGIN}=http://127.0.0.1:{port}/bff,{SITE_ORIGIN}=http://127.0.0.1:{port}",
+            "CRAWLER_TRACE": trace_file,
+            "CRAWLER_RATE": str(crawler_rate),
+            "CRAWLER_MAX_RATE": str(crawler_rate),
+            "CRAWLER_ARCHIVE": "0",
+        }
+        with open(os.path.join(workdir, "output.log"), 'w+', encoding='utf-8') as log:
+            started = time.perf_counter()
+            process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, argv[0]), *argv[1:]],
+                                       cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+            # wait4 로 이 프로세스(와 자식 프로세스)만의 CPU 시간, 최대 RSS 를 가져옴
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            elapsed = time.perf_counter() - started
+            if process.returncode != 0:
+                log.seek(0)
+                print(log.read()[-2000:])
+
+        latencies, statuses = [], {}
+        if os.path.exists(trace_file):
+            with open(trace_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    latency, status_code, _ = line.rstrip("\n").split("\t", 2)
+                    latencies.append(float(latency))
+                    statuses[status_code] = statuses.get(status_code, 0) + 1
+
+    pages = statuses.get("200", 0)
+    return {
+        "exit_code": process.returncode,
+        "seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "pages": pages,
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),  # Linux 기준 KB
+        "statuses": statuses,
+    }
+
+
+def compare_baseline(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base and result["pages_per_sec"] < base["pages_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: {base['pages_per_sec']} → {result['pages_per_sec']} pages/sec")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="크롤러 오프라인 벤치마크")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--record", action="store_true", help="벤치마크 전에 실제 사이트에서 fixture 를 내려받음")
+    parser.add_argument("--pages", type=int, default=5, help="내려받거나 합성할 목록 페이지 수")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.02, help="응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="응답 지연 ± 범위(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--crawler-rate", type=float, default=1000, help="크롤러 속도 제한기 시작/최대 속도(요청/초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 pages/sec 감소 비율")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixture_dir, args.pages)
+    elif not glob.glob(os.path.join(args.fixture_dir, "list", "*.json")):
+        synthetic_fixtures(args.fixture_dir, args.pages)
+
+    list_pages, details = load_fixtures(args.fixture_dir)
+    server = start_server(list_pages, details, args.latency, args.jitter, args.rate_429, args.rate_5xx)
+    print(f"🔹 로컬 서버 :{server.server_port} (목록 {len(list_pages)}페이지, 상세 {len(details)}개)")
+
+    results = {}
+    for name in args.scenarios:
+        argv = [arg.replace("{pages}", str(len(list_pages))) for arg in SCENARIOS[name]]
+        results[name] = result = run_scenario(name, argv, server.server_port, args.crawler_rate)
+        print(f"{name:>20}: {result['pages_per_sec']:8.2f} pages/sec  p50 {result['p50_ms']:7.1f} ms  "
+              f"p99 {result['p99_ms']:7.1f} ms  CPU {result['cpu_seconds']:6.2f}s  RSS {result['peak_rss_mb']:6.1f} MB"
+              f"{'' if result['exit_code'] == 0 else '  ❌ exit ' + str(result['exit_code'])}")
+    server.shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = [name for name, result in results.items() if result["exit_code"] != 0]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_baseline(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"⚠️ 성능 저하: {regression}")
+    if failed or regressions:
+        raise SystemExit(1)
@@ -0,0 +1,64 @@
+import argparse
+import glob
+import os
+import time
+import http_client
+from detail_parser import ENGINES, FAST_PARSER, parse_detail
+
+'''
+상세 페이지 파서 벤치마크
+- html_dir 의 *.html 을 각 엔진으로 파싱해 페이지당 시간과 결과 일치 여부 출력
+- --fetch START_TALK_NO 로 최신 talkNo 부터 --count 개의 상세 페이지를 html_dir 에 먼저 저장할 수 있음
+
+사용 예시:
+python bench_detail_parser.py bench_html --fetch 978459 --count 50
+python bench_detail_parser.py bench_html --repeat 5
+'''
+
+DETAIL_URL = 'https://www.albamon.com/alba-talk/experience/{talk_no}?sortType=CREATED_DATE'
+
+
+def save_pages(html_dir, start_talk_no, count):
+    os.makedirs(html_dir, exist_ok=True)
+    for talk_no in range(start_talk_no, start_talk_no - count, -1):
+        response = http_client.fetch(DETAIL_URL.format(talk_no=talk_no))
+        with open(os.path.join(html_dir, f"{talk_no}.html"), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+    http_client.close()
+
+
+def run_benchmark(pages, repeat):
+    baseline = [parse_detail(html, engine="full") for html in pages]
+    results = {}
+    for engine in ENGINES:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parsed = [parse_detail(html, engine=engine) for html in pages]
+        elapsed = time.perf_counter() - started
+        results[engine] = (elapsed / (repeat * len(pages)) * 1000, parsed == baseline)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="상세 페이지 파서 벤치마크")
+    parser.add_argument("html_dir")
+    parser.add_argument("--fetch", type=int, metavar="START_TALK_NO", help="벤치마크 전에 상세 페이지를 내려받을 시작 talkNo")
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fetch:
+        save_pages(args.html_dir, args.fetch, args.count)
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.html_dir, "*.html"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    if not pages:
+        raise SystemExit(f"❌ {args.html_dir} 에 html 파일이 없습니다.")
+
+    print(f"페이지 {len(pages)}개, 반복 {args.repeat}회, fast 엔진 파서: {FAST_PARSER}")
+    results = run_benchmark(pages, args.repeat)
+    base_ms = results["full"][0]
+    for engine, (ms, same) in results.items():
+        print(f"{engine:>10}: {ms:7.2f} ms/page  x{base_ms / ms:5.2f}  결과 일치: {'✅' if same else '❌'}")
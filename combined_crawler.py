@@ -1,160 +1,236 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import ssl
-import chromedriver_autoinstaller
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-from datetime import datetime
 import os
-import requests
-import json
-import time
+import argparse
+import re
+import httpx
+from crawling import find_talk_no_range, fetch_talk_collection, convert_date
+from crawl_state import load_high_water_mark, save_high_water_mark, prepend_csv
+import http_client
+from crawl_journal import CrawlJournal
+from record_sink import RecordSink, ProgressReporter
+from detail_parser import parse_detail, to_post_row
+from pipeline_crawler import crawl_post_detail_pipeline
+from talk_index import TalkIndex, MISSING_STATUS
+from page_archive import PageArchive
 
 # bs4 기본 설정
 headers = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/537.36 (KHTML, like Gecko) Chrome/73.0.3683.86 Safari/537.36'}
 
 # 목록 페이지 URL
 BASE_URL = 'https://www.albamon.com/alba-talk/experience'
-TARGET_PAGE_URL = "https://www.albamon.com/alba-talk/experience?pageIndex={page}&searchKeyword=&sortType=CREATED_DATE"
 TARGET_PAGE = 1330
+POST_FIELDS = ["talkNo", "Title", "Contents", "Date", "ViewCount", "Comments"]
 
-# 크롤링 결과 저장용 리스트
-post_data = []
-
-'''
-ChromeDriver Setting
-'''
-ssl._create_default_https_context = ssl._create_unverified_context  # SSL 인증서 검증 비활성화
-
-# 자동으로 ChromeDriver 설치
-chromedriver_autoinstaller.install()
-
-# Selenium 실행 옵션 설정
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-
-# Chrome WebDriver 실행
-service = Service()
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-
-def get_soup(target_url, talkNo, headers):
+def get_detail(target_url, talkNo, headers):
     url = f'{target_url}/{talkNo}?sortType=CREATED_DATE'
-    # 요청 및 BeautifulSoup 객체 생성
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return soup
-
-
-def parse_comment_items(comment_list):
-    # 날짜와 텍스트를 저장할 리스트
-    comments_data = []
-    for comment in comment_list:
-        # 댓글 텍스트 추출
-        comment_text_element = comment.select_one('.comment-list__text-override')
-        comment_text = comment_text_element.get_text(strip=True) if comment_text_element else "N/A"
-
-        # 데이터 딕셔너리에 저장
-        comments_data.append(comment_text)
-    return comments_data
-    
-
-'''
-talkNo만 추출하기 위함
-'''
-def crawl_talk_no(pageIndex):
-    print(f"🚀 페이지 {pageIndex} 크롤링 시작...")
-    driver.get(TARGET_PAGE_URL.format(page=pageIndex))
-    time.sleep(3)  # 페이지 로드 대기
-
-    buttons = WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".Button_button__S9rjD.Button_text__5x_Cn.Button_large___Kecx.tertiary")))
-    
-    # JavaScript를 이용해 클릭 (클릭 오류 방지)
-    driver.execute_script("arguments[0].scrollIntoView();", buttons[0])
-    driver.execute_script("arguments[0].click();", buttons[0])  
-
-    time.sleep(2)  # 페이지 로드 대기
-    # 현재 페이지 URL에서 talkNo 추출
-    current_url = driver.current_url
-    talk_no = current_url.split("/")[-1].split("?")[0]  # talkNo 추출
-    print(f"🔹 게시글 URL: {current_url}")
-
-    return talk_no
+    # 요청 후 필요한 영역만 파싱 (detail_parser)
+    response = http_client.fetch(url, headers=headers)
+    detail = parse_detail(response.text)
+    detail["status_code"] = response.status_code
+    return detail
 
 
 '''
 최근 talkNo 부터 n개의 게시물 크롤링
 '''
-def crawl_post_detail(START_TALK_NO, LAST_TALK_NO):
+def crawl_post_detail(START_TALK_NO, LAST_TALK_NO, journal, progress, index):
+    # 게시글은 메모리에 모으지 않고 저널(JSONL)에 바로 기록, 확인하지 못한 talkNo 수를 반환
+    failed = 0
     for talk_no in range(START_TALK_NO, LAST_TALK_NO, -1):
-        soup = get_soup(BASE_URL, talk_no, headers)
-        # 덧글 저장 리스트
-        parsed_comments = []
-
-        # 콘텐츠 영역 (게시글 제목, 내용, 작성일자)
-        title_element = soup.select_one('.DetailTitle_detail__header--title__Bbp40')
-        content_element = soup.select_one('.Detail_content__content__hJ5M7')
-        date_element = soup.select_one('.CommonInfos_info__wrapper__aGcEl > div:nth-child(2)')
-        view_count_element = soup.select_one('.experience__span--view')
-
-        title = title_element.get_text(strip=True) if title_element else "N/A"
-        contents = content_element.get_text(strip=True) if content_element else "N/A"
-        content_date = date_element.get_text(strip=True) if date_element else "N/A"
-        view_count = view_count_element.get_text(strip=True) if date_element else "N/A"
-        # 필수값이 없거나 빈 문자열이면 저장하지 않고 넘어가기
-        if not title_element or not title_element.get_text(strip=True) or not contents or not content_date:
+        # 저널에 이미 기록된 talkNo 는 건너뛰기 (--resume)
+        if journal.is_done(talk_no):
+            continue
+        # 이전 스캔에서 없던 talkNo 는 요청하지 않음
+        if index.is_missing(talk_no):
+            progress.tick(saved=False)
             continue
 
+        detail = get_detail(BASE_URL, talk_no, headers)
 
-        # 댓글 리스트 파싱
-        comment_list = soup.select('.CommentList_comment-contents__YVrtF > ul li')
-        parsed_comments = parse_comment_items(comment_list)
-
-        # 게시글 데이터를 리스트에 추가
-        post_data.append({
-            "talkNo": talk_no,
-            "Title": title,
-            "Contents": contents,
-            "Date": content_date,
-            "ViewCount": view_count,
-            "Comments": parsed_comments
-        })
-
-        print(f"talkNo: {talk_no}")
-        print(f"Title: {title}")
-        print(f"Contents: {contents}")
-        print(f"Date: {content_date}")
-        print(f"comments : {parsed_comments}")
-        print(f"ViewCount: {view_count}")
-        print("-" * 80)
-
-    return post_data
-    
-
-START_TALK_NO = int(crawl_talk_no(1))
-LAST_TALK_NO = int(crawl_talk_no(TARGET_PAGE))
+        # 필수값이 없거나 빈 문자열이면 저장하지 않고 넘어가기
+        if not detail["title"]:
+            # 200/404 만 없는 글로 확정, 재시도 뒤에도 429/5xx 면 저널에 기록하지 않아 --resume 때 다시 요청
+            if detail["status_code"] in MISSING_STATUS:
+                index.mark_missing(talk_no, detail["status_code"])
+                journal.record(talk_no)
+            else:
+                failed += 1
+            progress.tick(saved=False)
+            continue
 
-data = crawl_post_detail(START_TALK_NO, LAST_TALK_NO)
+        # 게시글 데이터를 저널에 기록
+        journal.record(talk_no, to_post_row(talk_no, detail))
+        progress.tick()
+    return failed
 
-# 브라우저 종료
-driver.quit()
 
-# 데이터프레임 생성
-df = pd.DataFrame(data)
-# 저장할 디렉토리 생성
-output_dir = "crawling_result"
-os.makedirs(output_dir, exist_ok=True)
+'''
+목록 API 우선 크롤링 (hybrid)
+- 제목/내용/작성일/조회수는 목록 API 응답을 그대로 사용
+- 상세 페이지는 댓글이 있는 게시글(replyCount > 0)만 요청해서 댓글만 가져옴
+- 댓글을 가져오지 못한 게시글 수를 반환
+'''
+def crawl_post_hybrid(START_TALK_NO, LAST_TALK_NO, journal, progress):
+    detail_requests = 0
+    failed = 0
+    page = 1
+    while True:
+        items = fetch_talk_collection(page)
+        if not items:
+            break
+
+        for item in items:
+            talk_no = item["talkNo"]
+            if talk_no > START_TALK_NO:
+                continue  # 크롤링을 시작한 뒤 새로 올라온 게시글 (다음 증분 실행에서 수집)
+            if talk_no <= LAST_TALK_NO:
+                print(f"🔹 상세 페이지 요청 {detail_requests}회 (목록 게시글 {progress.count}개)")
+                return failed
+            if journal.is_done(talk_no):
+                continue
+
+            comments = []
+            if (item.get("replyCount") or 0) > 0:
+                detail = get_detail(BASE_URL, talk_no, headers)
+                detail_requests += 1
+                if detail["status_code"] != 200:
+                    # 댓글을 못 가져온 게시글은 저널에 기록하지 않아 --resume 때 다시 요청
+                    print(f"❌ talkNo {talk_no} 댓글 요청 실패! 상태 코드: {detail['status_code']}")
+                    failed += 1
+                    progress.tick(saved=False)
+                    continue
+                comments = [comment["comment_text"] for comment in detail["comments"]]
+
+            journal.record(talk_no, {
+                "talkNo": talk_no,
+                "Title": item.get("title", "N/A"),
+                "Contents": item.get("contents", "N/A"),
+                "Date": convert_date(item.get("createdDate", "N/A")),
+                "ViewCount": item.get("viewCount", "N/A"),
+                "Comments": comments
+            })
+            progress.tick()
+        page += 1
+
+    print(f"🔹 상세 페이지 요청 {detail_requests}회 (목록 게시글 {progress.count}개)")
+    return failed
 
 
-# CSV 파일로 저장
-csv_file =  os.path.join(output_dir, "crawling_combined_result.csv")
-df.to_csv(csv_file, index=False, encoding='utf-8-sig')  # UTF-8 인코딩으로 저장
-print(f"Data saved to {csv_file}")
\ No newline at end of file
+'''
+아카이브에 저장된 상세 페이지 HTML 로 CSV 재생성 (네트워크 요청 없음)
+'''
+def reparse_from_archive(csv_file):
+    archive = PageArchive()
+    pages = []
+    for url, entry in archive.iter_pages(BASE_URL + "/"):
+        match = re.search(r"/(\d+)\?", url)
+        if match:
+            pages.append((int(match.group(1)), entry))
+
+    progress = ProgressReporter("아카이브 재파싱")
+    with RecordSink(csv_file, fieldnames=POST_FIELDS, fmt="csv") as sink:
+        for talk_no, entry in sorted(pages, key=lambda page: page[0], reverse=True):
+            detail = parse_detail(archive.read_text(entry))
+            if detail["title"]:
+                sink.write(to_post_row(talk_no, detail))
+            progress.tick(saved=bool(detail["title"]))
+    progress.done()
+    archive.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="알바톡 상세 페이지 크롤러")
+    parser.add_argument("--last-page", type=int, default=TARGET_PAGE,
+                        help="가장 오래된 talkNo 를 읽을 목록 페이지 (0 이면 마지막 페이지를 자동 탐색)")
+    parser.add_argument("--incremental", action="store_true", help="지난 실행 이후 새로 올라온 게시글만 수집")
+    parser.add_argument("--resume", action="store_true", help="저널에 기록된 talkNo 는 건너뛰고 중단된 크롤링을 이어서 진행")
+    parser.add_argument("--reparse-from-archive", action="store_true", help="아카이브(CRAWLER_ARCHIVE=1 로 수집)의 HTML 로 CSV 만 다시 생성")
+    parser.add_argument("--list-index", action="store_true", help="상세 요청 전에 목록 API 로 유효한 talkNo 를 모아 빈 구간은 건너뜀")
+    parser.add_argument("--hybrid", action="store_true", help="본문은 목록 API 에서 가져오고 댓글이 있는 게시글만 상세 페이지 요청")
+    parser.add_argument("--pipeline", action="store_true", help="비동기 요청 + 프로세스 풀 파싱 파이프라인으로 크롤링")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수 (--pipeline 사용 시)")
+    parser.add_argument("--workers", type=int, default=None, help="파서 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--queue-size", type=int, default=100, help="단계 사이 큐 크기 (메모리 상한)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.reparse_from_archive:
+        csv_file = os.path.join("crawling_result", "crawling_combined_result.csv")
+        reparse_from_archive(csv_file)
+        print(f"Data saved to {csv_file}")
+        raise SystemExit(0)
+
+    journal = CrawlJournal(resume=args.resume)
+    if args.resume and journal.range is not None:
+        # 중단된 실행의 범위를 그대로 이어서 진행
+        START_TALK_NO, STOP_TALK_NO = journal.range
+        incremental = journal.incremental
+        gap = journal.first_gap(START_TALK_NO, STOP_TALK_NO)
+        print(f"🔁 이어서 크롤링: talkNo {gap} 부터 (범위 {START_TALK_NO} ~ {STOP_TALK_NO + 1})")
+    else:
+        high_water_mark = load_high_water_mark("combined_crawler") if args.incremental else None
+        incremental = high_water_mark is not None
+
+        if incremental:
+            # 증분 모드: 최신 talkNo 부터 지난번 수집한 talkNo 직전까지만 수집
+            START_TALK_NO = max(item["talkNo"] for item in fetch_talk_collection(1))
+            STOP_TALK_NO = high_water_mark
+            print(f"🔹 증분 크롤링: talkNo {START_TALK_NO} ~ {high_water_mark + 1}")
+        else:
+            # 목록 API 로 최신/가장 오래된 talkNo 조회 (브라우저 불필요)
+            START_TALK_NO, LAST_TALK_NO = find_talk_no_range(args.last_page or None)
+            if START_TALK_NO is None:
+                raise SystemExit("❌ 목록 API 에서 talkNo 범위를 찾지 못했습니다.")
+            print(f"🔹 talkNo 범위: {START_TALK_NO} ~ {LAST_TALK_NO}")
+            # LAST_TALK_NO 까지 포함
+            STOP_TALK_NO = LAST_TALK_NO - 1
+        journal.set_range(START_TALK_NO, STOP_TALK_NO, incremental)
+
+    progress = ProgressReporter("상세 크롤링")
+    index = TalkIndex()
+    try:
+        if args.list_index and not args.hybrid:
+            index.enumerate_valid(START_TALK_NO, STOP_TALK_NO)
+        if args.hybrid:
+            failed = crawl_post_hybrid(START_TALK_NO, STOP_TALK_NO, journal, progress)
+        elif args.pipeline:
+            failed = crawl_post_detail_pipeline(START_TALK_NO, STOP_TALK_NO, journal, progress, index,
+                                       args.concurrency, args.workers, args.queue_size)
+        else:
+            failed = crawl_post_detail(START_TALK_NO, STOP_TALK_NO, journal, progress, index)
+    except (KeyboardInterrupt, httpx.HTTPError) as e:
+        journal.close()
+        index.save()
+        progress.done()
+        print(f"⛔ 크롤링 중단 ({e.__class__.__name__}). --resume 옵션으로 이어서 실행할 수 있습니다.")
+        raise SystemExit(130)
+    journal.close()
+    index.save()
+    progress.done()
+    http_client.close()
+    print(f"📈 {http_client.limiter.report()}")
+
+    # 저장할 디렉토리 생성
+    output_dir = "crawling_result"
+    os.makedirs(output_dir, exist_ok=True)
+
+
+    # 저널의 게시글을 한 줄씩 CSV 로 옮김 (이전 실행에서 저널에 남긴 게시글 포함)
+    csv_file =  os.path.join(output_dir, "crawling_combined_result.csv")
+    sink_file = csv_file + ".new" if incremental else csv_file
+    with RecordSink(sink_file, fieldnames=POST_FIELDS, fmt="csv") as sink:
+        for row in journal.iter_rows():
+            sink.write(row)
+    if incremental:
+        prepend_csv(csv_file, sink_file)
+    print(f"Data saved to {csv_file} ({sink.count} rows)")
+
+    if failed:
+        # 받은 게시글은 저장하되 high-water mark 는 그대로 두고, 저널에 남은 범위를 --resume 으로 다시 요청
+        print(f"❌ talkNo {failed}개를 확인하지 못해 high-water mark 를 유지합니다. --resume 옵션으로 다시 요청하세요.")
+        raise SystemExit(1)
+
+    # START_TALK_NO 이하의 talkNo 는 모두 확인했으므로 다음 실행의 기준점으로 저장
+    save_high_water_mark("combined_crawler", START_TALK_NO)
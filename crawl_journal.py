@@ -0,0 +1,95 @@
+import json
+import os
+
+'''
+상세 크롤링 write-ahead 저널 (append-only JSONL)
+- 첫 줄: 크롤링 범위 {"range": [start, stop], "incremental": bool} (stop 은 포함하지 않음)
+- 이후 talkNo 하나를 끝낼 때마다 한 줄 {"talkNo": n, "row": {...}} 기록
+  (삭제/다른 유형 게시글처럼 저장하지 않은 talkNo 는 "row": null)
+- 중간에 죽어서 마지막 줄이 잘려도 그 줄만 무시하고 이어서 진행
+- 메모리에는 완료된 talkNo 만 두고, 게시글 내용은 iter_rows() 로 파일에서 다시 읽음
+'''
+
+JOURNAL_FILE = os.path.join("crawling_result", "crawl_post_detail.journal.jsonl")
+FSYNC_EVERY = 50  # n줄마다 디스크에 강제 기록
+
+
+class CrawlJournal:
+    def __init__(self, path=JOURNAL_FILE, resume=False):
+        self.path = path
+        self.range = None
+        self.incremental = False
+        self.done = set()  # 처리 완료된 talkNo
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if resume and os.path.exists(path):
+            self._load()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        self._pending = 0
+        if resume and self._ends_mid_line():
+            self._file.write("\n")  # 잘린 줄 뒤에 이어 쓰지 않도록 줄바꿈 추가
+
+    def _ends_mid_line(self):
+        if os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _entries(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 도중 끊긴 줄
+
+    def _load(self):
+        for entry in self._entries():
+            if "range" in entry:
+                self.range = tuple(entry["range"])
+                self.incremental = entry.get("incremental", False)
+            elif "talkNo" in entry:
+                self.done.add(entry["talkNo"])
+        print(f"📒 저널에서 {len(self.done)}개의 완료된 talkNo 를 불러왔습니다.")
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= FSYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def set_range(self, start_talk_no, stop_talk_no, incremental=False):
+        self.range = (start_talk_no, stop_talk_no)
+        self.incremental = incremental
+        self._write({"range": [start_talk_no, stop_talk_no], "incremental": incremental})
+
+    def is_done(self, talk_no):
+        return talk_no in self.done
+
+    def record(self, talk_no, row=None):
+        self.done.add(talk_no)
+        self._write({"talkNo": talk_no, "row": row})
+
+    def first_gap(self, start_talk_no, stop_talk_no):
+        # 내림차순 범위에서 아직 처리하지 않은 첫 talkNo
+        for talk_no in range(start_talk_no, stop_talk_no, -1):
+            if talk_no not in self.done:
+                return talk_no
+        return None
+
+    def iter_rows(self):
+        # 저장할 게시글만 기록된 순서대로 반환 (한 번에 하나씩 읽어 메모리 사용 일정)
+        if not self._file.closed:
+            self._file.flush()
+        for entry in self._entries():
+            if entry.get("row") is not None:
+                yield entry["row"]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
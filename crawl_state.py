@@ -0,0 +1,70 @@
+import csv
+import json
+import os
+from datetime import datetime
+
+'''
+증분 크롤링 상태 저장
+- 크롤러별로 이미 수집한 가장 큰 talkNo(high-water mark)를 JSON 파일에 저장
+- 다음 실행에서는 이 값보다 큰(새로운) talkNo 만 수집
+'''
+
+STATE_FILE = os.path.join("crawling_result", "crawl_state.json")
+
+
+def _load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_high_water_mark(name):
+    return _load_state().get(name, {}).get("high_water_mark")
+
+
+def save_high_water_mark(name, talk_no):
+    if talk_no is None:
+        return
+    state = _load_state()
+    previous = state.get(name, {}).get("high_water_mark")
+    # 값이 줄어들지 않도록 유지
+    if previous is not None and previous >= talk_no:
+        return
+    state[name] = {"high_water_mark": int(talk_no), "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_file = STATE_FILE + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, STATE_FILE)
+    print(f"💾 {name} high-water mark 저장: {talk_no}")
+
+
+def prepend_csv(csv_file, new_csv_file, key="talkNo"):
+    # 새로 수집한 CSV 를 기존 CSV 앞에 붙여 최신순을 유지 (같은 talkNo 는 새 값 우선)
+    # 전체를 메모리에 올리지 않고 한 줄씩 복사
+    if not os.path.exists(csv_file):
+        os.replace(new_csv_file, csv_file)
+        return
+
+    with open(new_csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        new_keys = {row[key] for row in reader}
+        if reader.fieldnames is None:  # 새로 수집한 게시글 없음
+            new_keys = None
+    if new_keys is None:
+        os.remove(new_csv_file)
+        return
+
+    tmp_file = csv_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8-sig', newline='') as out:
+        with open(new_csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            writer = csv.DictWriter(out, fieldnames=reader.fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(reader)
+        with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+            writer.writerows(row for row in csv.DictReader(f) if row[key] not in new_keys)
+    os.replace(tmp_file, csv_file)
+    os.remove(new_csv_file)
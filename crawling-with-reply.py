@@ -4,161 +4,153 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import argparse
 import chromedriver_autoinstaller
+import queue
 import ssl
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 import os
-
-# bs4 기본 설정
-headers = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/537.36 (KHTML, like Gecko) Chrome/73.0.3683.86 Safari/537.36'}
-
-def get_soup(url, headers):
-    # 요청 및 BeautifulSoup 객체 생성
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return soup
-
-# ✅ **댓글 크롤링하는 함수**
-def get_comments_from_page(comment_list):
-    # 날짜와 텍스트를 저장할 리스트
-    comments_data = []
-    for comment in comment_list:
-        # 댓글 텍스트 추출
-        comment_text_element = comment.select_one('.comment-list__text-override')
-        comment_text = comment_text_element.get_text(strip=True) if comment_text_element else "N/A"
-
-        # 데이터 딕셔너리에 저장
-        comments_data.append(comment_text)
-    return comments_data
-
-
-
-
+import httpx
+import http_client
+from crawling import fetch_talk_collection
+from record_sink import RecordSink, ProgressReporter
+from detail_parser import parse_detail, TITLE_SELECTOR
+
+'''
+브라우저가 꼭 필요한 경우를 위한 상세 크롤링 (브라우저 풀)
+- 목록 버튼 클릭 / 뒤로 가기 대신 목록 API 의 talkNo 로 상세 URL 에 바로 이동
+- 브라우저 N개를 풀로 두고 게시글을 나눠서 렌더링 (이미지, 폰트, CSS 요청은 차단)
+- 고정 대기 대신 제목이 그려질 때까지만 기다리고, 렌더링된 DOM(page_source)을 그대로 파싱 (HTTP 재요청 없음)
+
+사용 예시:
+python crawling-with-reply.py --browsers 4
+'''
 
 ssl._create_default_https_context = ssl._create_unverified_context  # SSL 인증서 검증 비활성화
 
-# 자동으로 ChromeDriver 설치
-chromedriver_autoinstaller.install()
-
-# Selenium 실행 옵션 설정
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-
-# Chrome WebDriver 실행
-service = Service()
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-# 목록 페이지 URL
-base_url = "https://www.albamon.com/alba-talk/experience?pageIndex={page}&searchKeyword=&sortType=CREATED_DATE"
-
-# 버튼 클릭 후 상세 페이지 크롤링
-def crawl_experience(endPageIndex):
-    results = []
-    for page in range(1, endPageIndex+1):  
-        print(f"🚀 페이지 {page} 크롤링 시작...")
-        driver.get(base_url.format(page=page))  # 페이지 이동
-        time.sleep(3)  # 페이지 로드 대기
-    
-        # ✅ 버튼 리스트 가져오기 (게시글 목록)
-        # buttons = driver.find_elements(By.CSS_SELECTOR, ".Button_button__S9rjD.Button_text__5x_Cn.Button_large___Kecx.tertiary")
-
-         # 버튼이 로드될 때까지 기다림
+# 상세 페이지 URL
+DETAIL_URL = "https://www.albamon.com/alba-talk/experience"
+BROWSER_COUNT = 4
+PAGE_WAIT = 10  # 제목이 그려질 때까지 최대 대기 시간(초)
+
+# 렌더링에 필요 없는 리소스 (CDP 로 요청 자체를 차단)
+BLOCKED_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css"]
+
+
+def create_driver():
+    # Selenium 실행 옵션 설정
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    chrome_options.page_load_strategy = "eager"  # 이미지 등 리소스 로딩 완료를 기다리지 않음
+
+    driver = webdriver.Chrome(service=Service(), options=chrome_options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+class BrowserPool:
+    # 스레드마다 브라우저 하나를 빌려 쓰고 돌려놓는 풀
+    def __init__(self, size):
+        self.size = size
+        self._drivers = queue.Queue()
+        for _ in range(size):
+            self._drivers.put(create_driver())
+
+    @contextmanager
+    def driver(self):
+        driver = self._drivers.get()
         try:
-            buttons = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".Button_button__S9rjD.Button_text__5x_Cn.Button_large___Kecx.tertiary"))                )
-        except:
-            print(f"⚠️ 페이지 {page}에서 버튼을 찾을 수 없습니다. 다음 페이지로 이동합니다.")
-            continue  # 다음 페이지로 이동
-        
-        for i in range(len(buttons)):  # 각 버튼 클릭
-            if i >= len(buttons):
-                print(f"⚠️ {i}번째 버튼이 없습니다. 리스트 길이: {len(buttons)}")
-                break
+            yield driver
+        finally:
+            self._drivers.put(driver)
 
-            # JavaScript를 이용해 클릭 (클릭 오류 방지)
-            driver.execute_script("arguments[0].scrollIntoView();", buttons[i])
-            driver.execute_script("arguments[0].click();", buttons[i])  # JavaScript 클릭 사용
+    def close(self):
+        while not self._drivers.empty():
+            self._drivers.get().quit()
 
-            time.sleep(2)  # 페이지 로드 대기
 
-            # 현재 페이지 URL에서 talkNo 추출
-            current_url = driver.current_url
-            talk_no = current_url.split("/")[-1].split("?")[0]  # talkNo 추출
-            print(f"🔹 게시글 URL: {current_url}")
-
-            # ✅ BeautifulSoup으로 페이지 파싱
-            soup = get_soup(current_url, headers)
-
-            # 상세 페이지에서 제목, 내용, 날짜 크롤링
+def render_detail(pool, talk_no):
+    # 상세 페이지로 바로 이동해 제목이 그려질 때까지만 기다린 뒤 DOM 을 가져옴
+    url = f"{DETAIL_URL}/{talk_no}?sortType=CREATED_DATE"
+    with pool.driver() as driver:
+        http_client.limiter.acquire()  # 공용 속도 제어기로 요청 간격 조절
+        try:
+            driver.get(url)
+            WebDriverWait(driver, PAGE_WAIT).until(EC.presence_of_element_located((By.CSS_SELECTOR, TITLE_SELECTOR)))
+        except TimeoutException:
+            return None  # 삭제되었거나 다른 talkType 의 게시글
+        except WebDriverException as e:
+            print(f"❌ {talk_no} 렌더링 실패: {e.msg}")
+            return None
+        html = driver.page_source
+    return parse_detail(html)
+
+
+def crawl_experience(endPageIndex, sink, progress, pool):
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        for page in range(1, endPageIndex+1):
+            print(f"🚀 페이지 {page} 크롤링 시작...")
             try:
-                # 콘텐츠 영역 (게시글 제목, 내용, 작성일자)
-                title_element = soup.select_one('.DetailTitle_detail__header--title__Bbp40')
-                contents_element = soup.select_one('.Detail_content__content__hJ5M7')
-                date_element = soup.select_one('.CommonInfos_info__wrapper__aGcEl > div:nth-child(2)')
-                view_count_element = soup.select_one('.experience__span--view')
+                items = fetch_talk_collection(page)
+            except httpx.HTTPError as e:
+                print(f"⚠️ 페이지 {page} 목록을 가져오지 못했습니다: {e}")
+                continue
+            if not items:
+                break
 
-                title = title_element.get_text(strip=True) if title_element else "N/A"
-                contents = contents_element.get_text(strip=True) if contents_element else "N/A"
-                date = date_element.get_text(strip=True) if date_element else "N/A"
-                view_count = view_count_element.get_text(strip=True) if date_element else "N/A"
+            talk_nos = [item["talkNo"] for item in items]
+            details = executor.map(lambda talk_no: render_detail(pool, talk_no), talk_nos)
 
+            # 목록 순서대로 바로 파일에 기록
+            for talk_no, detail in zip(talk_nos, details):
                 # 필수값이 없거나 빈 문자열이면 저장하지 않고 넘어가기
-                if not title_element or not title_element.get_text(strip=True) or not contents or not date:
+                if not detail or not detail["title"]:
+                    progress.tick(saved=False)
                     continue
 
-                # 댓글 리스트 파싱
-                comment_list = soup.select('.CommentList_comment-contents__YVrtF > ul li')
-                parsed_comments = get_comments_from_page(comment_list)
-                
-                # 데이터 저장
-                results.append({
+                sink.write({
                     "talkNo": talk_no,
-                    "Title": title,
-                    "Contents": contents,
-                    "Date": date,
-                    "ViewCount": view_count,
-                    "Comments": parsed_comments
+                    "Title": detail["title"],
+                    "Contents": detail["contents"],
+                    "Date": detail["date"],
+                    "ViewCount": detail["view_count"],
+                    "Comments": [comment["comment_text"] for comment in detail["comments"]]
                 })
-
-                print(f"talkNo: {talk_no}")
-                print(f"Title: {title}")
-                print(f"Contents: {contents}")
-                print(f"Date: {date}")
-                print(f"comments : {parsed_comments}")
-                print(f"ViewCount: {view_count}")
-                print("-" * 80)
-
-            except Exception as e:
-                print(f"❌ 데이터 크롤링 실패: {e}")
-
-            # 뒤로 가기
-            driver.back()
-            time.sleep(2)
-
-            # 다시 버튼 리스트 가져오기
-            buttons = driver.find_elements(By.CSS_SELECTOR, ".Button_button__S9rjD.Button_text__5x_Cn.Button_large___Kecx.tertiary")
-
-
-    return results
-
-# 크롤링 실행
-data = crawl_experience(1330)
-
-# 브라우저 종료
-driver.quit()
-
-# 데이터프레임 생성
-df = pd.DataFrame(data)
-# 저장할 디렉토리 생성
-output_dir = "crawling_result"
-os.makedirs(output_dir, exist_ok=True)
-
-# CSV 파일로 저장
-csv_file =  os.path.join(output_dir, "crawling_detail_result.csv")
-df.to_csv(csv_file, index=False, encoding='utf-8-sig')  # UTF-8 인코딩으로 저장
-print(f"Data saved to {csv_file}")
\ No newline at end of file
+                progress.tick()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="브라우저 풀 상세 크롤링")
+    parser.add_argument("--browsers", type=int, default=BROWSER_COUNT, help="동시에 띄울 브라우저 수")
+    parser.add_argument("--end-page", type=int, default=1330)
+    args = parser.parse_args()
+
+    # 자동으로 ChromeDriver 설치
+    chromedriver_autoinstaller.install()
+
+    # 저장할 디렉토리 생성
+    output_dir = "crawling_result"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file =  os.path.join(output_dir, "crawling_detail_result.csv")
+
+    # 크롤링 실행 (게시글은 도착하는 대로 CSV 에 기록)
+    pool = BrowserPool(args.browsers)
+    progress = ProgressReporter("상세 크롤링")
+    try:
+        with RecordSink(csv_file, fieldnames=["talkNo", "Title", "Contents", "Date", "ViewCount", "Comments"], fmt="csv") as sink:
+            crawl_experience(args.end_page, sink, progress, pool)
+    finally:
+        # 브라우저 종료
+        pool.close()
+        http_client.close()
+    progress.done()
+    print(f"📈 {http_client.limiter.report()}")
+    print(f"Data saved to {csv_file}")
@@ -1,14 +1,21 @@
-import requests
 from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
 import os
-import requests
+import sys
 import json
+import argparse
+import asyncio
+from urllib.parse import urlparse
+import httpx
+import http_client
+from crawl_state import load_high_water_mark, save_high_water_mark, prepend_csv
+from record_sink import RecordSink, ProgressReporter
+from page_archive import PageArchive
 
 TARGET_URL = 'https://www.albamon.com/alba-talk/experience'
 TARGET_API_URL = 'https://bff-albatalk.albamon.com/talks?pageRowSize=20&searchKeyword=&talkType=EXPERIENCE&sortType=CREATED_DATE&pageIndex='
 TARGET_PAGE = 1330
+TALK_FIELDS = ["talkNo", "Title", "Contents", "Date", "ViewCount", "ReplyCount"]
 
  # 헤더와 요청
 headers = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/537.36 (KHTML, like Gecko) Chrome/73.0.3683.86 Safari/537.36'}
@@ -18,7 +25,7 @@ headers = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/
 def fetch_page_data(target_url, page, headers):
     url = f'{target_url}?pageIndex={page}&searchKeyword=&sortType=CREATED_DATE'
     # 요청 및 BeautifulSoup 객체 생성
-    response = requests.get(url, headers=headers)
+    response = http_client.fetch(url, headers=headers)
     soup = BeautifulSoup(response.text, 'html.parser')
     return soup
 
@@ -59,77 +66,285 @@ def parse_items(common_list):
         })
     return data
 
+def parse_talk_items(data):
+    # 목록 API 응답(collection)에서 필요한 필드만 추출
+    extracted_data = []  # 결과를 저장할 리스트
+
+    for item in data['collection']:
+        # 날짜 변환
+        raw_date = item.get("createdDate", "N/A")
+        converted_date = convert_date(raw_date)
+
+        # 데이터 추출 및 저장
+        extracted_data.append({
+            "talkNo": item.get("talkNo", "N/A"),  # talkNo 추가
+            "Title": item.get("title", "N/A"),
+            "Contents": item.get("contents", "N/A"),
+            "Date": converted_date,
+            "ViewCount": item.get("viewCount", "N/A"),  # 조회수 추가
+            "ReplyCount": item.get("replyCount", "N/A")  # 댓글 개수 추가
+        })
+
+    return extracted_data  # 가공된 데이터 반환
+
+
 def get_talkNo_api(page):
-    response = requests.get(f"{TARGET_API_URL}{page}", headers=headers)
+    response = http_client.fetch(f"{TARGET_API_URL}{page}", headers=headers)
 
     if response.status_code == 200:
         data = json.loads(response.text)
-        extracted_data = []  # 결과를 저장할 리스트
-
-        for item in data['collection']:
-            # 날짜 변환
-            raw_date = item.get("createdDate", "N/A")
-            converted_date = convert_date(raw_date)
-
-            # 데이터 추출 및 저장
-            extracted_data.append({
-                "talkNo": item.get("talkNo", "N/A"),  # talkNo 추가
-                "Title": item.get("title", "N/A"),
-                "Contents": item.get("contents", "N/A"),
-                "Date": converted_date,
-                "ViewCount": item.get("viewCount", "N/A"),  # 조회수 추가
-                "ReplyCount": item.get("replyCount", "N/A")  # 댓글 개수 추가
-            })
-
-            # 출력
-            print(f"Title: {item.get('title', 'N/A')}")
-            print(f"Contents: {item.get('contents', 'N/A')}")
-            print(f"Date: {converted_date}")
-            print(f"talkNo: {item.get('talkNo', 'N/A')}")
-            print(f"View Count: {item.get('viewCount', 'N/A')}")
-            print(f"Reply Count: {item.get('replyCount', 'N/A')}")
-            print("-" * 80)
-
-        return extracted_data  # 가공된 데이터 반환
+        return parse_talk_items(data)
     else:
         print(f"❌ 요청 실패! 상태 코드: {response.status_code}")
         return []
 
 
+'''
+브라우저 없이 talkNo 범위 찾기
+- 목록 API 는 최신순(sortType=CREATED_DATE)이므로 1페이지 첫 글이 가장 최신 talkNo
+- 마지막 페이지를 모르면 지수 탐색 + 이분 탐색으로 마지막 페이지를 찾음
+'''
+def fetch_talk_collection(page):
+    response = http_client.fetch(f"{TARGET_API_URL}{page}", headers=headers)
+    response.raise_for_status()
+    return response.json().get('collection', [])
+
+
+def find_last_page(page_hint=TARGET_PAGE, cache=None):
+    cache = {} if cache is None else cache
+
+    def has_posts(page):
+        if page not in cache:
+            cache[page] = fetch_talk_collection(page)
+        return len(cache[page]) > 0
+
+    if not has_posts(1):
+        return 0
+
+    # lo: 게시글이 있는 페이지, hi: 비어있는 페이지
+    lo, hi = 1, max(page_hint, 2)
+    while has_posts(hi):
+        lo, hi = hi, hi * 2
+
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if has_posts(mid):
+            lo = mid
+        else:
+            hi = mid
+
+    print(f"🔎 마지막 페이지: {lo} (API 호출 {len(cache)}회)")
+    return lo
+
+
+def find_talk_no_range(last_page=None):
+    # last_page 가 주어지면 2번의 호출로 끝나고, 없으면 마지막 페이지를 탐색
+    cache = {}
+    if last_page is None:
+        last_page = find_last_page(cache=cache)
+        if last_page == 0:
+            return None, None
+
+    first = cache[1] if 1 in cache else fetch_talk_collection(1)
+    last = cache[last_page] if last_page in cache else fetch_talk_collection(last_page)
+    if not first or not last:
+        return None, None
+
+    newest_talk_no = max(item["talkNo"] for item in first)
+    oldest_talk_no = min(item["talkNo"] for item in last)
+    return newest_talk_no, oldest_talk_no
+
+
+'''
+비동기 크롤링 (httpx.AsyncClient)
+- concurrency: 동시에 진행할 최대 요청 수
+- min_interval: 같은 호스트에 대한 요청 시작 간 최소 간격(초)
+'''
+class HostPoliteness:
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_slot = {}  # 호스트별 다음 요청 가능 시각
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def get_talkNo_api_async(client, page, semaphore, politeness):
+    url = f"{TARGET_API_URL}{page}"
+    async with semaphore:
+        await politeness.wait(url)
+        try:
+            response = await http_client.fetch_async(client, url, headers=headers)
+        except httpx.HTTPError as e:
+            print(f"❌ 페이지 {page} 요청 실패: {e}")
+            return page, []
+
+    if response.status_code == 200:
+        return page, parse_talk_items(response.json())
+    else:
+        print(f"❌ 페이지 {page} 요청 실패! 상태 코드: {response.status_code}")
+        return page, []
+
+
+def sort_by_talk_no(rows):
+    # 최신 talkNo 부터 정렬 (순차 크롤링 결과와 동일한 순서)
+    return sorted(rows, key=lambda row: row["talkNo"] if isinstance(row["talkNo"], int) else -1, reverse=True)
+
+
+def max_talk_no(rows):
+    talk_nos = [row["talkNo"] for row in rows if isinstance(row["talkNo"], int)]
+    return max(talk_nos) if talk_nos else None
+
+
+def write_rows(sink, progress, rows):
+    # 한 페이지 분량을 talkNo 순서로 바로 파일에 기록하고, 그중 가장 큰 talkNo 반환
+    for row in sort_by_talk_no(rows):
+        sink.write(row)
+        progress.tick()
+    return max_talk_no(rows)
+
+
+def crawl_api(sink, progress, start_page, end_page):
+    newest = None
+    for page in range(start_page, end_page + 1):
+        page_newest = write_rows(sink, progress, get_talkNo_api(page))
+        newest = newest or page_newest
+    return newest
+
+
+async def crawl_api_async(sink, progress, start_page, end_page, concurrency=10, min_interval=0.1):
+    semaphore = asyncio.Semaphore(concurrency)
+    politeness = HostPoliteness(min_interval)
+
+    # 페이지는 순서 없이 도착하므로 앞 페이지가 올 때까지 잠시 보관했다가 페이지 순서대로 기록
+    pending = {}
+    next_page = start_page
+    newest = None
+    async with http_client.create_async_client(concurrency) as client:
+        tasks = [get_talkNo_api_async(client, page, semaphore, politeness)
+                 for page in range(start_page, end_page + 1)]
+        for done in asyncio.as_completed(tasks):
+            page, page_data = await done
+            pending[page] = page_data
+            while next_page in pending:
+                page_newest = write_rows(sink, progress, pending.pop(next_page))
+                newest = newest or page_newest
+                next_page += 1
+
+    return newest
+
+
+'''
+증분 크롤링: 최신순 목록을 1페이지부터 넘기다가 이미 수집한 talkNo 를 만나면 중단
+- (가장 큰 talkNo, 이미 수집한 talkNo 까지 도달했는지) 반환
+- 페이지 요청이 실패했거나 max_pages 안에 도달하지 못하면 그 사이 게시글을 놓쳤을 수 있으므로
+  high-water mark 를 올리면 안 됨
+'''
+def crawl_api_incremental(sink, progress, high_water_mark, max_pages=TARGET_PAGE):
+    newest = None
+    for page in range(1, max_pages + 1):
+        page_data = get_talkNo_api(page)
+        if not page_data:
+            print(f"❌ 페이지 {page}에서 이미 수집한 talkNo({high_water_mark})에 도달하기 전에 목록이 끊겼습니다.")
+            return newest, False
+
+        fresh = [row for row in page_data if isinstance(row["talkNo"], int) and row["talkNo"] > high_water_mark]
+        page_newest = write_rows(sink, progress, fresh)
+        newest = newest or page_newest
+        if len(fresh) < len(page_data):
+            print(f"🔹 페이지 {page}에서 이미 수집한 talkNo({high_water_mark})에 도달하여 중단합니다.")
+            return newest, True
+    print(f"❌ {max_pages}페이지까지 이미 수집한 talkNo({high_water_mark})에 도달하지 못했습니다.")
+    return newest, False
+
+
+'''
+아카이브에 저장된 목록 API 응답으로 CSV 재생성 (네트워크 요청 없음)
+'''
+def reparse_from_archive(sink, progress):
+    archive = PageArchive()
+    pages = []
+    for url, entry in archive.iter_pages(TARGET_API_URL):
+        page = url[len(TARGET_API_URL):]
+        if page.isdigit():
+            pages.append((int(page), entry))
+
+    newest = None
+    for page, entry in sorted(pages, key=lambda item: item[0]):
+        page_newest = write_rows(sink, progress, parse_talk_items(json.loads(archive.read_text(entry))))
+        newest = newest or page_newest
+    archive.close()
+    return newest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="알바톡 목록 API 크롤러")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="httpx.AsyncClient 로 페이지를 동시에 크롤링")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수 (--async 사용 시)")
+    parser.add_argument("--min-interval", type=float, default=0.1, help="같은 호스트 요청 간 최소 간격(초)")
+    parser.add_argument("--start-page", type=int, default=1)
+    parser.add_argument("--end-page", type=int, default=TARGET_PAGE)
+    parser.add_argument("--reparse-from-archive", action="store_true", help="아카이브(CRAWLER_ARCHIVE=1 로 수집)의 응답으로 CSV 만 다시 생성")
+    parser.add_argument("--incremental", action="store_true", help="지난 실행 이후 새로 올라온 게시글만 수집")
+    return parser.parse_args()
 
-# 크롤링 결과 저장용 리스트
-all_data = []
 
-# 1페이지부터 n페이지까지 크롤링
-# for page in range(1, 11):
-#     print(f"Crawling page {page}")
-    
-#     soup = fetch_page_data(TARGET_URL, page, headers)
-    
-#     # 공통 리스트 선택
-#     common_list = soup.select('.CommonList_wrapper__padding__CP_Jc')
+if __name__ == "__main__":
+    args = parse_args()
 
-#     page_data = parse_items(common_list)
-#     all_data.extend(page_data)
+    # 1페이지부터 n페이지까지 크롤링
+    # for page in range(1, 11):
+    #     print(f"Crawling page {page}")
+        
+    #     soup = fetch_page_data(TARGET_URL, page, headers)
+        
+    #     # 공통 리스트 선택
+    #     common_list = soup.select('.CommonList_wrapper__padding__CP_Jc')
 
+    #     page_data = parse_items(common_list)
+    #     all_data.extend(page_data)
 
 
-# api 에서 가져온 데이터
-for page in range(1, TARGET_PAGE + 1):
-    print(f"Crawling page {page}")
-    
-    page_data = get_talkNo_api(page)
-    all_data.extend(page_data)
+    # 저장할 디렉토리 생성
+    output_dir = "crawling_result"
+    os.makedirs(output_dir, exist_ok=True)
+    csv_file = os.path.join(output_dir, "crawling_results_talkNo.csv")
 
+    high_water_mark = load_high_water_mark("crawling") if args.incremental and not args.reparse_from_archive else None
+    complete = True
 
-# # DataFrame 생성
-df = pd.DataFrame(all_data)
+    # 결과는 메모리에 모으지 않고 도착하는 대로 CSV 에 기록 (증분 모드는 임시 파일에 쓴 뒤 기존 파일 앞에 붙임)
+    sink_file = csv_file + ".new" if high_water_mark is not None else csv_file
+    progress = ProgressReporter("목록 크롤링")
+    with RecordSink(sink_file, fieldnames=TALK_FIELDS, fmt="csv") as sink:
+        if args.reparse_from_archive:
+            newest = reparse_from_archive(sink, progress)
+        elif high_water_mark is not None:
+            # 증분 모드: 지난번 가장 큰 talkNo 보다 새로운 게시글만 수집
+            print(f"🔹 증분 크롤링: talkNo {high_water_mark} 이후 게시글만 수집합니다.")
+            newest, complete = crawl_api_incremental(sink, progress, high_water_mark, args.end_page)
+        elif args.use_async:
+            # 비동기 모드: 페이지는 순서 없이 도착하지만 talkNo 순서로 저장
+            newest = asyncio.run(crawl_api_async(sink, progress, args.start_page, args.end_page, args.concurrency, args.min_interval))
+        else:
+            # api 에서 가져온 데이터
+            newest = crawl_api(sink, progress, args.start_page, args.end_page)
+    progress.done()
 
-# # 저장할 디렉토리 생성
-output_dir = "crawling_result"
-os.makedirs(output_dir, exist_ok=True)
+    if high_water_mark is not None:
+        prepend_csv(csv_file, sink_file)
+    print(f"Data saved to {csv_file} ({progress.saved} new rows)")
 
-# # CSV 파일로 저장
-csv_file = os.path.join(output_dir, "crawling_results_talkNo.csv")
-df.to_csv(csv_file, index=False, encoding='utf-8-sig')
-print(f"Data saved to {csv_file}")
+    if not complete:
+        # 받은 게시글은 저장하되(다음 실행에서 같은 talkNo 는 새 값으로 교체) high-water mark 는 그대로 두고 다시 실행
+        print(f"❌ 증분 크롤링이 끝까지 진행되지 않아 high-water mark({high_water_mark})를 유지합니다.")
+        sys.exit(1)
+    save_high_water_mark("crawling", newest)
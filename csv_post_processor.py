@@ -1,30 +1,23 @@
-import pandas as pd
 import os
-from openai import AzureOpenAI
-from dotenv import load_dotenv
-import time
-
-# .env 파일 로드
-load_dotenv()
-
-endpoint = os.getenv("ENDPOINT_URL")  
-deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4o")  
-subscription_key = os.getenv("AZURE_OPENAI_API_KEY")  
-
-# Azure OpenAI 설정
-client = AzureOpenAI(
-    azure_endpoint=endpoint,  
-    api_key=subscription_key,  
-    api_version="2024-05-01-preview",
-)
+import sys
+import argparse
+import re
+import refine_batches
+from gpt_client import deployment
+from gpt_cache import make_key
+from refine_batches import MAX_TOKENS
+from stream_parser import BlockStreamParser
 
 # 폴더 생성
 os.makedirs("crawling_result", exist_ok=True)
 os.makedirs("refine_result", exist_ok=True)
 
+TENDENCIES = ("경험성", "질문성")
+StreamParser = BlockStreamParser  # --stream 일 때 응답 조각에서 완성된 게시글을 꺼내는 파서
+ENTRY_NUMBER = re.compile(r"^\s*(\d+)\.")  # 결과 블록 맨 앞의 "[번호]."
 
-def process_text_with_gpt(prompt, index):
-    system_prompt = """
+
+SYSTEM_PROMPT = """
     당신은 게시글 분석 및 정제 전문가입니다. 게시글의 타이틀, 내용, 댓글을 분석하여 핵심 정보를 추출하고 일관된 형식으로 재작성해야 합니다.
 
     # 주요 목표
@@ -102,6 +95,7 @@ def process_text_with_gpt(prompt, index):
     3. 일관된 형식 준수
     4. 키워드는 각 게시글별로 독립적으로 추출
     5. 댓글이 없는 경우 "댓글: 없음" 으로 표시
+    6. 출력의 번호는 입력 게시글의 번호를 그대로 사용하고, 게시글 사이는 빈 줄 하나로 구분
 
     # 예시 입출력
     입력:
@@ -127,134 +121,129 @@ def process_text_with_gpt(prompt, index):
     - 치킨
     성향: 경험성
     """
-    
-    try:
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=8000,
-            temperature=0.7,
-            top_p=0.95,
-            frequency_penalty=0,
-            presence_penalty=0,
-            stop=None,
-            stream=False
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"Error processing row {index}: {e}")
-        return None
 
-def process_csv(input_file, output_file):
-    # CSV 파일 읽기
-    df_input = pd.read_csv(input_file,
-                encoding='utf-8',
-                quotechar='"',  # 따옴표 문자 지정
-                doublequote=True,  # 이중 따옴표 처리
-                lineterminator='\n'  # 줄바꿈 문자 지정
-                )
-
-    # 새로운 DataFrame 생성
-    df_output = pd.DataFrame(columns=['id', 'content', 'comments', 'keywords', 'tendency', 'views', 'date'])
-              
-    # 첫 번째 배치 전에 파일 생성
-    df_output.to_csv(output_file, index=False, encoding='utf-8-sig')
-
-    # 10개씩 배치 처리
-    batch_size = 10
-    for i in range(0, len(df_input), batch_size):
-        batch_end = min(i + batch_size, len(df_input))
-        print(f"Processing batch {i//batch_size + 1}: rows {i+1} to {batch_end}")
-        
-        # 배치의 입력 데이터 생성
-        input_data = ""
-        for j in range(i, batch_end):
-            input_data += f"{j+1}. Title: {df_input.iloc[j]['Title']}, Contents: {df_input.iloc[j]['Contents']}, Comments: {df_input.iloc[j]['Comments']}\n"
-        
-        # GPT 처리
-        result = process_text_with_gpt(input_data, i)
-        print(result)
-        
-        if result:
-            # 각 항목별로 결과 파싱
-            try:
-                # 번호로 결과 분리
-                entries = result.split('\n\n')
-                for entry_idx, entry in enumerate(entries):
-                    if not entry.strip():
-                        continue
-                    
-                    df_idx = i + entry_idx
-                    if df_idx >= len(df_input):
-                        break
-                    
-                    # 내용, 댓글, 키워드, 성향으로 분리
-                    lines = entry.split('\n')
-                    content = ""
-                    comments = []
-                    keywords = []
-                    tendency = ""
-                    
-                    current_section = "content"
-                    for line in lines:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        print(line)
-                        if line.startswith("댓글:"):
-                            current_section = "comments"
-                            if line.strip() == "댓글: 없음":
-                                comments = ["없음"]
-                            else:
-                                comments = []
-                        elif line.startswith("키워드:"):
-                            current_section = "keywords"
-                            keywords = []
-                        elif line.startswith("성향:"):
-                            current_section = "tendency"
-                            tendency = line.split(":")[1].strip()
-                        elif line.startswith("-") or (current_section == "comments" and line[0].isdigit()):
-                            if current_section == "comments" and comments != ["없음"]:
-                                # 번호로 시작하는 경우 번호 제거
-                                if line[0].isdigit():
-                                    comment_text = line.split('.', 1)[1].strip() if '.' in line else line
-                                else:
-                                    comment_text = line[1:].strip()
-                                comments.append(comment_text)
-                            elif current_section == "keywords":
-                                keywords.append(line[1:].strip())
-                        else:
-                            if current_section == "content":
-                                # 번호 제거 (예: "7. " 제거)
-                                if line[0].isdigit() and '. ' in line:
-                                    line = '.'.join(line.split('.')[1:]).strip()
-                                content = line
-                    
-                    # DataFrame에 저장
-                    df_output.at[df_idx, 'id'] = df_input.iloc[df_idx]['talkNo']
-                    df_output.at[df_idx, 'content'] = content
-                    df_output.at[df_idx, 'comments'] = '; '.join(comments)
-                    df_output.at[df_idx, 'keywords'] = '; '.join(keywords) if keywords else ""
-                    df_output.at[df_idx, 'tendency'] = tendency
-                    df_output.at[df_idx, 'views'] = df_input.iloc[df_idx]['ViewCount']
-                    df_output.at[df_idx, 'date'] = df_input.iloc[df_idx]['Date']
-
-                # 각 배치 처리 후 바로 파일에 저장
-                df_output.to_csv(output_file, index=False, encoding='utf-8-sig')
-                print(f"Processing complete. Results saved to {output_file}")
-
-            except Exception as e:
-                print(f"Error parsing GPT response for batch starting at row {i}: {e}")
-        
-        # API 호출 제한을 위한 대기
-        time.sleep(1)
-    
-
-# 사용 예시
-input_file = 'crawling_result/crawling_combined_result.csv'   # 입력 CSV 파일 경로
-output_file = 'refine_result/output2.csv'  # 출력 CSV 파일 경로
-
-process_csv(input_file, output_file)
\ No newline at end of file
+
+def request_args(prompt, stream=False):
+    return dict(
+        model=deployment,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=MAX_TOKENS,
+        temperature=0.7,
+        top_p=0.95,
+        frequency_penalty=0,
+        presence_penalty=0,
+        stop=None,
+        stream=stream
+    )
+
+
+def response_text(response):
+    return response.choices[0].message.content
+
+
+def delta_text(chunk):
+    # Azure 는 choices 가 비어 있는 조각(프롬프트 필터 결과)을 먼저 보냄
+    if not chunk.choices:
+        return None
+    delta = chunk.choices[0].delta
+    return delta.content
+
+
+def build_prompt(df_input, rows):
+    # 배치의 입력 데이터 생성 (번호는 입력 CSV 의 행 번호)
+    input_data = ""
+    for j in rows:
+        input_data += f"{j+1}. Title: {df_input.iloc[j]['Title']}, Contents: {df_input.iloc[j]['Contents']}, Comments: {df_input.iloc[j]['Comments']}\n"
+    return input_data
+
+
+def cache_key(df_input, j):
+    row = df_input.iloc[j]
+    return make_key(deployment, SYSTEM_PROMPT, None, row['Title'], row['Contents'], row['Comments'])
+
+
+def parse_entry(entry):
+    # 내용, 댓글, 키워드, 성향으로 분리
+    lines = entry.split('\n')
+    content = ""
+    comments = []
+    keywords = []
+    tendency = ""
+
+    current_section = "content"
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        print(line)
+        if line.startswith("댓글:"):
+            current_section = "comments"
+            if line.strip() == "댓글: 없음":
+                comments = ["없음"]
+            else:
+                comments = []
+        elif line.startswith("키워드:"):
+            current_section = "keywords"
+            keywords = []
+        elif line.startswith("성향:"):
+            current_section = "tendency"
+            tendency = line.split(":")[1].strip()
+        elif line.startswith("-") or (current_section == "comments" and line[0].isdigit()):
+            if current_section == "comments" and comments != ["없음"]:
+                # 번호로 시작하는 경우 번호 제거
+                if line[0].isdigit():
+                    comment_text = line.split('.', 1)[1].strip() if '.' in line else line
+                else:
+                    comment_text = line[1:].strip()
+                comments.append(comment_text)
+            elif current_section == "keywords":
+                keywords.append(line[1:].strip())
+        else:
+            if current_section == "content":
+                # 번호 제거 (예: "7. " 제거)
+                if line[0].isdigit() and '. ' in line:
+                    line = '.'.join(line.split('.')[1:]).strip()
+                content = line
+
+    return {"content": content, "comments": comments, "keywords": keywords, "tendency": tendency}
+
+
+def match_items(entries, df_input, rows):
+    # 블록 맨 앞의 번호(입력 행 번호)로 입력 게시글과 맞춰보고, 이 배치에 있고 형식이 맞는 결과만 {행 번호: 결과} 로 반환
+    expected = {j + 1: j for j in rows}
+    posts = {}
+    for entry in entries:
+        match = ENTRY_NUMBER.match(entry)
+        df_idx = expected.get(int(match.group(1))) if match else None
+        if df_idx is None or df_idx in posts:
+            continue
+        post = parse_entry(entry)
+        if post['content'] and post['tendency'] in TENDENCIES:
+            posts[df_idx] = post
+    return posts
+
+
+def parse_result(result, df_input, rows):
+    print(result)
+    return match_items(result.split('\n\n'), df_input, rows)
+
+
+def process_csv(input_file, output_file, concurrency=1, use_cache=True, fresh=False, stream=False):
+    # 배치 구성, 재시도, 저장은 refine_batches 에서 처리하고 이 모듈은 프롬프트와 결과 형식만 제공
+    refine_batches.process_csv(sys.modules[__name__], input_file, output_file, concurrency, use_cache, fresh, stream)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="게시글 GPT 정제")
+    parser.add_argument("--input", default='crawling_result/crawling_combined_result.csv', help="입력 CSV 파일 경로")
+    parser.add_argument("--output", default='refine_result/output2.csv', help="출력 CSV 파일 경로")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 보낼 배치 요청 수 (2 이상이면 여러 배치를 동시에 요청)")
+    parser.add_argument("--no-cache", action="store_true", help="캐시된 결과를 쓰지 않고 모든 게시글을 다시 요청")
+    parser.add_argument("--fresh", action="store_true", help="기존 출력에서 이어서 하지 않고 처음부터 다시 처리")
+    parser.add_argument("--stream", action="store_true", help="스트리밍으로 받아 게시글이 완성되는 대로 저장")
+    args = parser.parse_args()
+
+    process_csv(args.input, args.output, args.concurrency, use_cache=not args.no_cache, fresh=args.fresh, stream=args.stream)
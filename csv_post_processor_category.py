@@ -1,24 +1,10 @@
 import pandas as pd
-import os
-from openai import AzureOpenAI
-from dotenv import load_dotenv
+import gpt_client
 import json
 import time
 
-# .env 파일 로드
-load_dotenv()
-
-endpoint = os.getenv("ENDPOINT_URL")  
-# deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4o-mini")
+# 모델은 gpt-4o-mini 고정, 엔드포인트/키는 gpt_client 의 배포 풀에서 선택
 deployment = "gpt-4o-mini"
-subscription_key = os.getenv("AZURE_OPENAI_API_KEY") 
- 
-# Azure OpenAI 설정
-client = AzureOpenAI(
-    azure_endpoint=endpoint,  
-    api_key=subscription_key,  
-    api_version="2024-05-01-preview",
-)
 
 def classify_post(keywords, categories):
     functions = [
@@ -55,7 +41,7 @@ def classify_post(keywords, categories):
     """
 
     try:
-        response = client.chat.completions.create(
+        response = gpt_client.chat(
             model=deployment,
             messages=[
                 {"role": "system", "content": "당신은 데이터 분류 전문가입니다."},
@@ -1,72 +1,68 @@
-import pandas as pd
 import os
-from openai import AzureOpenAI
-from dotenv import load_dotenv
-import time
+import sys
+import argparse
 import json
-
-# .env 파일 로드
-load_dotenv()
-
-endpoint = os.getenv("ENDPOINT_URL")  
-deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4o")  
-subscription_key = os.getenv("AZURE_OPENAI_API_KEY")  
-
-# Azure OpenAI 설정
-client = AzureOpenAI(
-    azure_endpoint=endpoint,  
-    api_key=subscription_key,  
-    api_version="2024-05-01-preview",
-)
+import refine_batches
+from gpt_client import deployment
+from gpt_cache import make_key
+from refine_batches import MAX_TOKENS
+from refine_output import id_key
+from stream_parser import JsonItemStreamParser
 
 # 폴더 생성
 os.makedirs("crawling_result", exist_ok=True)
 os.makedirs("refine_result", exist_ok=True)
 
+TENDENCIES = ("경험성", "질문성")
+StreamParser = JsonItemStreamParser  # --stream 일 때 응답 조각에서 완성된 게시글을 꺼내는 파서
 
-def process_text_with_gpt(prompt, index):
-    functions = [
-        {
-            "name": "process_posts",
-            "description": "여러 게시글과 댓글을 분석하여 정제된 형식으로 출력",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "posts": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "content": {
-                                    "type": "string",
-                                    "description": "정제된 게시글 내용"
-                                },
-                                "comments": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "정제된 댓글 목록"
-                                },
-                                "keywords": {
-                                    "type": "array",
-                                    "items": {"type": "string"},
-                                    "description": "추출된 키워드 목록 (3-5개)"
-                                },
-                                "tendency": {
-                                    "type": "string",
-                                    "enum": ["경험성", "질문성"],
-                                    "description": "게시글의 성향"
-                                }
+FUNCTIONS = [
+    {
+        "name": "process_posts",
+        "description": "여러 게시글과 댓글을 분석하여 정제된 형식으로 출력",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "posts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "talkNo": {
+                                "type": "integer",
+                                "description": "입력 게시글의 talkNo (그대로 복사)"
+                            },
+                            "content": {
+                                "type": "string",
+                                "description": "정제된 게시글 내용"
                             },
-                            "required": ["content", "comments", "keywords", "tendency"]
-                        }
+                            "comments": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "정제된 댓글 목록"
+                            },
+                            "keywords": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "추출된 키워드 목록 (3-5개)"
+                            },
+                            "tendency": {
+                                "type": "string",
+                                "enum": ["경험성", "질문성"],
+                                "description": "게시글의 성향"
+                            }
+                        },
+                        "required": ["talkNo", "content", "comments", "keywords", "tendency"]
                     }
-                },
-                "required": ["posts"]
-            }
+                }
+            },
+            "required": ["posts"]
         }
-    ]
+    }
+]
 
-    system_prompt = """
+
+SYSTEM_PROMPT = """
     당신은 게시글 분석 및 정제 전문가입니다. 게시글의 타이틀, 내용, 댓글을 분석하여 핵심 정보를 추출하고 일관된 형식으로 재작성해야 합니다.
 
     # 주요 목표
@@ -169,87 +165,96 @@ def process_text_with_gpt(prompt, index):
     - 치킨
     성향: 경험성
     """
-    
-    try:
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            functions=functions,
-            function_call={"name": "process_posts"},
-            max_tokens=8000,
-            temperature=0.7,
-            top_p=0.95,
-            frequency_penalty=0,
-            presence_penalty=0,
-            stop=None,
-            stream=False
-        )
-        return response.choices[0].message.function_call.arguments
-    except Exception as e:
-        print(f"Error processing row {index}: {e}")
+
+
+def request_args(prompt, stream=False):
+    return dict(
+        model=deployment,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        functions=FUNCTIONS,
+        function_call={"name": "process_posts"},
+        max_tokens=MAX_TOKENS,
+        temperature=0.7,
+        top_p=0.95,
+        frequency_penalty=0,
+        presence_penalty=0,
+        stop=None,
+        stream=stream
+    )
+
+
+def response_text(response):
+    return response.choices[0].message.function_call.arguments
+
+
+def delta_text(chunk):
+    # Azure 는 choices 가 비어 있는 조각(프롬프트 필터 결과)을 먼저 보냄
+    if not chunk.choices:
         return None
+    delta = chunk.choices[0].delta
+    return delta.function_call.arguments if delta.function_call else None
+
+
+def build_prompt(df_input, rows):
+    # 배치의 입력 데이터 생성 (번호는 입력 CSV 의 행 번호)
+    input_data = ""
+    for j in rows:
+        input_data += f"{j+1}. talkNo: {df_input.iloc[j]['talkNo']}, Title: {df_input.iloc[j]['Title']}, Contents: {df_input.iloc[j]['Contents']}, Comments: {df_input.iloc[j]['Comments']}\n"
+    return input_data
+
+
+def cache_key(df_input, j):
+    row = df_input.iloc[j]
+    return make_key(deployment, SYSTEM_PROMPT, FUNCTIONS, row['Title'], row['Contents'], row['Comments'])
+
+
+def valid_post(post):
+    return (isinstance(post.get('content'), str) and post['content'].strip() != ""
+            and isinstance(post.get('comments'), list)
+            and isinstance(post.get('keywords'), list)
+            and post.get('tendency') in TENDENCIES)
+
+
+def match_items(items, df_input, rows):
+    # 결과의 talkNo 로 입력 게시글과 맞춰보고, 이 배치에 있고 형식이 맞는 결과만 {행 번호: 결과} 로 반환
+    expected = {id_key(df_input.iloc[j]['talkNo']): j for j in rows}
+    posts = {}
+    for post in items:
+        if not isinstance(post, dict):
+            continue
+        df_idx = expected.get(id_key(post.get('talkNo')))
+        if df_idx is None or df_idx in posts or not valid_post(post):
+            continue
+        posts[df_idx] = {key: post[key] for key in ('content', 'comments', 'keywords', 'tendency')}
+    return posts
+
+
+def parse_result(result, df_input, rows):
+    try:
+        result_dict = json.loads(result)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing GPT response for batch starting at row {rows[0]}: {e}")
+        return {}
+    print(result_dict)
+    return match_items(result_dict.get('posts', []), df_input, rows)
+
+
+def process_csv(input_file, output_file, concurrency=1, use_cache=True, fresh=False, stream=False):
+    # 배치 구성, 재시도, 저장은 refine_batches 에서 처리하고 이 모듈은 프롬프트와 결과 형식만 제공
+    refine_batches.process_csv(sys.modules[__name__], input_file, output_file, concurrency, use_cache, fresh, stream)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="게시글 GPT 정제 (function calling)")
+    parser.add_argument("--input", default='crawling_result/crawling_combined_result.csv', help="입력 CSV 파일 경로")
+    parser.add_argument("--output", default='refine_result/output3.csv', help="출력 CSV 파일 경로")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 보낼 배치 요청 수 (2 이상이면 여러 배치를 동시에 요청)")
+    parser.add_argument("--no-cache", action="store_true", help="캐시된 결과를 쓰지 않고 모든 게시글을 다시 요청")
+    parser.add_argument("--fresh", action="store_true", help="기존 출력에서 이어서 하지 않고 처음부터 다시 처리")
+    parser.add_argument("--stream", action="store_true", help="스트리밍으로 받아 게시글이 완성되는 대로 저장")
+    args = parser.parse_args()
 
-def process_csv(input_file, output_file):
-    # CSV 파일 읽기
-    df_input = pd.read_csv(input_file,
-                encoding='utf-8',
-                quotechar='"',  # 따옴표 문자 지정
-                doublequote=True,  # 이중 따옴표 처리
-                lineterminator='\n'  # 줄바꿈 문자 지정
-                )
-
-    # 새로운 DataFrame 생성
-    df_output = pd.DataFrame(columns=['id', 'content', 'comments', 'keywords', 'tendency', 'views', 'date'])
-              
-    # 첫 번째 배치 전에 파일 생성
-    df_output.to_csv(output_file, index=False, encoding='utf-8-sig')
-
-    # 10개씩 배치 처리
-    batch_size = 20
-    for i in range(0, len(df_input), batch_size):
-        batch_end = min(i + batch_size, len(df_input))
-        print(f"Processing batch {i//batch_size + 1}: rows {i+1} to {batch_end}")
-        
-        # 배치의 입력 데이터 생성
-        input_data = ""
-        for j in range(i, batch_end):
-            input_data += f"{j+1}. Title: {df_input.iloc[j]['Title']}, Contents: {df_input.iloc[j]['Contents']}, Comments: {df_input.iloc[j]['Comments']}\n"
-        
-        # GPT 처리
-        result = process_text_with_gpt(input_data, i)
-        if result:
-            try:
-                result_dict = json.loads(result)
-                print(result_dict)
-                # 배치의 각 게시글에 대해 처리
-                for idx, post in enumerate(result_dict['posts']):
-                    df_idx = i + idx
-                    if df_idx >= len(df_input):
-                        break
-                    
-                    df_output.at[df_idx, 'id'] = df_input.iloc[df_idx]['talkNo']
-                    df_output.at[df_idx, 'content'] = post['content']
-                    df_output.at[df_idx, 'comments'] = '; '.join(post['comments'])
-                    df_output.at[df_idx, 'keywords'] = '; '.join(post['keywords'])
-                    df_output.at[df_idx, 'tendency'] = post['tendency']
-                    df_output.at[df_idx, 'views'] = df_input.iloc[df_idx]['ViewCount']
-                    df_output.at[df_idx, 'date'] = df_input.iloc[df_idx]['Date']
-
-                # 각 배치 처리 후 바로 파일에 저장
-                df_output.to_csv(output_file, index=False, encoding='utf-8-sig')
-                print(f"Processing complete. Results saved to {output_file}")
-
-            except Exception as e:
-                print(f"Error parsing GPT response for batch starting at row {i}: {e}")
-        
-        time.sleep(1)
-    
-
-# 사용 예시
-input_file = 'crawling_result/crawling_combined_result.csv'   # 입력 CSV 파일 경로
-output_file = 'refine_result/output3.csv'  # 출력 CSV 파일 경로
-
-process_csv(input_file, output_file)
\ No newline at end of file
+    process_csv(args.input, args.output, args.concurrency, use_cache=not args.no_cache, fresh=args.fresh, stream=args.stream)
@@ -1,98 +1,91 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
 import os
 import json
+import http_client
+from crawling import fetch_talk_collection
+from crawl_state import load_high_water_mark, save_high_water_mark, prepend_csv
+from record_sink import RecordSink, ProgressReporter
+from detail_parser import parse_detail
+from talk_index import TalkIndex, MISSING_STATUS
 
 TARGET_URL = 'https://www.albamon.com/alba-talk/experience'
-SART_TALK_NO = 978459
+CRAWL_COUNT = 100  # 이전 기록이 없을 때 최신 talkNo 부터 수집할 개수
  
  # 헤더와 요청
 headers = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/537.36 (KHTML, like Gecko) Chrome/73.0.3683.86 Safari/537.36'}
 
 def fetch_data(target_url, talkNo, headers):
     url = f'{target_url}/{talkNo}?sortType=CREATED_DATE'
-    # 요청 및 BeautifulSoup 객체 생성
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return soup
+    # 요청 후 필요한 영역만 파싱 (detail_parser)
+    response = http_client.fetch(url, headers=headers)
+    detail = parse_detail(response.text)
+    detail["status_code"] = response.status_code
+    return detail
 
 
 
-def parse_comment_items(comment_list):
-    # 날짜와 텍스트를 저장할 리스트
-    comments_data = []
-    for comment in comment_list:
-        # 날짜 추출
-        comment_date_element = comment.select_one('.comment-list__detail-override')
-        comment_date = comment_date_element.get_text(strip=True) if comment_date_element else "N/A"
-
-        # 댓글 텍스트 추출
-        comment_text_element = comment.select_one('.comment-list__text-override')
-        comment_text = comment_text_element.get_text(strip=True) if comment_text_element else "N/A"
-
-        # 데이터 딕셔너리에 저장
-        comments_data.append({"comment_date": comment_date, "comment_text": comment_text})
-    return comments_data
+# 시작 talkNo 는 목록 API 의 최신 게시글, 이전 실행 기록이 있으면 그 talkNo 까지만 수집
+START_TALK_NO = max(item["talkNo"] for item in fetch_talk_collection(1))
+high_water_mark = load_high_water_mark("detail-brute-force")
+STOP_TALK_NO = high_water_mark if high_water_mark is not None else START_TALK_NO - CRAWL_COUNT
+print(f"🔹 talkNo {START_TALK_NO} ~ {STOP_TALK_NO + 1} 수집")
 
+# 저장할 디렉토리 생성
+output_dir = "crawling_result"
+os.makedirs(output_dir, exist_ok=True)
 
+# 게시글은 메모리에 모으지 않고 바로 CSV 에 기록 (증분 실행은 임시 파일에 쓴 뒤 기존 파일 앞에 붙임)
+csv_file =  os.path.join(output_dir, "crawling_detail_results_array.csv")
+sink_file = csv_file + ".new" if high_water_mark is not None else csv_file
+sink = RecordSink(sink_file, fieldnames=["talkNo", "title", "content", "content_date", "comments"], fmt="csv")
+progress = ProgressReporter("상세 크롤링")
 
-# 크롤링 결과 저장용 리스트
-post_data = []  # 게시글 데이터
-comment_data = []  # 댓글 데이터
+# 목록 API 로 유효한 talkNo 를 먼저 모으고, 빈 구간과 이전에 없던 talkNo 는 요청하지 않음
+index = TalkIndex()
+index.enumerate_valid(START_TALK_NO, STOP_TALK_NO)
 
 # 최근 talkNo 부터 n개의 게시물 크롤링
-for talkNo in range(SART_TALK_NO, SART_TALK_NO-100, -1):
-    soup = fetch_data(TARGET_URL, talkNo, headers)
-    # 덧글 저장 리스트
-    parsed_comments = []
-
-     # 콘텐츠 영역 (게시글 제목, 내용, 작성일자)
-    title_element = soup.select_one('.DetailTitle_detail__header--title__Bbp40')
-    content_element = soup.select_one('.Detail_content__content__hJ5M7')
-    date_element = soup.select_one('.CommonInfos_info__wrapper__aGcEl > div:nth-child(2)')
+failed = 0  # 재시도 뒤에도 429/5xx 라 확인하지 못한 talkNo 수
+for talkNo in range(START_TALK_NO, STOP_TALK_NO, -1):
+    if index.is_missing(talkNo):
+        progress.tick(saved=False)
+        continue
 
-    title = title_element.get_text(strip=True) if title_element else "N/A"
-    content = content_element.get_text(strip=True) if content_element else "N/A"
-    content_date = date_element.get_text(strip=True) if date_element else "N/A"
+    detail = fetch_data(TARGET_URL, talkNo, headers)
 
     # 필수값이 없거나 빈 문자열이면 저장하지 않고 넘어가기
-    if not title_element or not title_element.get_text(strip=True) or not content or not content_date:
+    if not detail["title"]:
+        if detail["status_code"] in MISSING_STATUS:
+            index.mark_missing(talkNo, detail["status_code"])
+        else:
+            failed += 1
+        progress.tick(saved=False)
         continue
 
-    
-
-    # 댓글 리스트 파싱
-    comment_list = soup.select('.CommentList_comment-contents__YVrtF > ul li')
-    parsed_comments = parse_comment_items(comment_list)
-
-    # 게시글 데이터를 리스트에 추가
-    post_data.append({
+    # 게시글 데이터를 파일에 기록
+    sink.write({
         "talkNo": talkNo,
-        "title": title,
-        "content": content,
-        "content_date": content_date,
-        "comments": json.dumps(parsed_comments, ensure_ascii=False)
+        "title": detail["title"],
+        "content": detail["contents"],
+        "content_date": detail["date"],
+        "comments": json.dumps(detail["comments"], ensure_ascii=False)
     })
+    progress.tick()
 
-    
-    print(f"✅ Saved talkNo {talkNo}")
-
-
-# 데이터프레임 생성
-df_posts = pd.DataFrame(post_data)
-# df_comments = pd.DataFrame(comment_data)
 
-# **게시글 데이터와 댓글 데이터를 talkNo를 기준으로 병합**
-# merged_data = pd.merge(df_posts, df_comments, on="talkNo", how="inner")
+sink.close()
+index.save()
+progress.done()
+http_client.close()
+print(f"📈 {http_client.limiter.report()}")
 
+if high_water_mark is not None:
+    prepend_csv(csv_file, sink_file)
+print(f"Data saved to {csv_file}")
 
-# 저장할 디렉토리 생성
-output_dir = "crawling_result"
-os.makedirs(output_dir, exist_ok=True)
+if failed:
+    # 받은 게시글은 저장하되(다음 실행에서 같은 talkNo 는 새 값으로 교체) high-water mark 는 그대로 두고 다시 실행
+    print(f"❌ talkNo {failed}개를 확인하지 못해 high-water mark 를 유지합니다.")
+    raise SystemExit(1)
 
-# CSV 파일로 저장
-csv_file =  os.path.join(output_dir, "crawling_detail_results_array.csv")
-df_posts.to_csv(csv_file, index=False, encoding='utf-8-sig')  # UTF-8 인코딩으로 저장
-print(f"Data saved to {csv_file}")
\ No newline at end of file
+save_high_water_mark("detail-brute-force", START_TALK_NO)
\ No newline at end of file
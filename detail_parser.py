@@ -0,0 +1,88 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+'''
+상세 페이지 추출
+- 필요한 것은 제목/내용/작성일/조회수/댓글 목록 뿐이므로 전체 DOM 을 만들지 않고
+  SoupStrainer 로 해당 클래스를 가진 태그(와 하위 트리)만 파싱
+- lxml(C 파서)이 설치되어 있으면 lxml, 없으면 html.parser 사용
+- bench_detail_parser.py 로 기존 방식(BeautifulSoup 전체 파싱)과 속도/결과 비교
+'''
+
+TITLE_SELECTOR = '.DetailTitle_detail__header--title__Bbp40'
+CONTENT_SELECTOR = '.Detail_content__content__hJ5M7'
+DATE_SELECTOR = '.CommonInfos_info__wrapper__aGcEl > div:nth-child(2)'
+VIEW_COUNT_SELECTOR = '.experience__span--view'
+COMMENT_SELECTOR = '.CommentList_comment-contents__YVrtF > ul li'
+COMMENT_TEXT_SELECTOR = '.comment-list__text-override'
+COMMENT_DATE_SELECTOR = '.comment-list__detail-override'
+
+# 위 셀렉터의 최상위 클래스
+DETAIL_CLASSES = {
+    "DetailTitle_detail__header--title__Bbp40", "Detail_content__content__hJ5M7",
+    "CommonInfos_info__wrapper__aGcEl", "experience__span--view", "CommentList_comment-contents__YVrtF",
+}
+
+
+def _has_detail_class(value):
+    # 파싱 중에는 class 값이 공백으로 이어진 문자열 하나로 넘어오므로 (class="a b") 토큰으로 나눠서 비교
+    if not value:
+        return False
+    tokens = value.split() if isinstance(value, str) else value
+    return not DETAIL_CLASSES.isdisjoint(tokens)
+
+
+# 위 클래스 중 하나라도 가진 태그만 남기는 필터
+DETAIL_STRAINER = SoupStrainer(attrs={"class": _has_detail_class})
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+ENGINES = {
+    # 기존 크롤러와 동일한 방식
+    "full": lambda html: BeautifulSoup(html, 'html.parser'),
+    "full-lxml": lambda html: BeautifulSoup(html, FAST_PARSER),
+    "strainer": lambda html: BeautifulSoup(html, 'html.parser', parse_only=DETAIL_STRAINER),
+    "fast": lambda html: BeautifulSoup(html, FAST_PARSER, parse_only=DETAIL_STRAINER),
+}
+
+
+def _text(soup, selector):
+    element = soup.select_one(selector)
+    return element.get_text(strip=True) if element else None
+
+
+def parse_comments(soup):
+    comments = []
+    for comment in soup.select(COMMENT_SELECTOR):
+        comments.append({
+            "comment_date": _text(comment, COMMENT_DATE_SELECTOR) or "N/A",
+            "comment_text": _text(comment, COMMENT_TEXT_SELECTOR) or "N/A",
+        })
+    return comments
+
+
+def parse_detail(html, engine="fast"):
+    # 제목이 없으면(삭제/다른 유형 게시글) title 이 None
+    soup = ENGINES[engine](html)
+    return {
+        "title": _text(soup, TITLE_SELECTOR),
+        "contents": _text(soup, CONTENT_SELECTOR) or "N/A",
+        "date": _text(soup, DATE_SELECTOR) or "N/A",
+        "view_count": _text(soup, VIEW_COUNT_SELECTOR) or "N/A",
+        "comments": parse_comments(soup),
+    }
+
+
+def to_post_row(talk_no, detail):
+    # combined_crawler 결과 CSV 형식의 게시글 한 행
+    return {
+        "talkNo": talk_no,
+        "Title": detail["title"],
+        "Contents": detail["contents"],
+        "Date": detail["date"],
+        "ViewCount": detail["view_count"],
+        "Comments": [comment["comment_text"] for comment in detail["comments"]]
+    }
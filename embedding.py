@@ -3,17 +3,9 @@ import re
 import pandas as pd
 import numpy as np
 import tiktoken
-from openai import AzureOpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-client = AzureOpenAI(
-    azure_endpoint = os.getenv("AZURE_OPENAI_ENDPOINT"),
-    api_key        = os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version    = os.getenv("OPENAI_API_VERSION")
-)
+import gpt_client
 
+# 임베딩/RAG 답변은 AZURE_OPENAI_ENDPOINT 리소스(gpt_client.embedding_pool)로 요청 (AZURE_OPENAI_EMBEDDING_QUOTA 의 한도 안에서)
 deployment_name = os.getenv("DEPLOYMENT_NAME")
 deployment_embedding_name = os.getenv("DEPLOYMENT_EMBEDDING_NAME")
 
@@ -38,13 +30,13 @@ def normalize_text(s, sep_token = " \n "):
     return s
 
 def generate_embeddings(text, model=deployment_embedding_name):
-    return client.embeddings.create(input = [text], model=model).data[0].embedding
+    return gpt_client.embed(input = [text], model=model).data[0].embedding
 
 def cosine_similarity(a, b):
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
 def get_embedding(text, model=deployment_embedding_name): # model = "deployment_name"
-    return client.embeddings.create(input = [text], model=model).data[0].embedding
+    return gpt_client.embed(input = [text], model=model).data[0].embedding
 
 def search_docs(df, user_query, top_n=3, to_print=True):
     embedding = get_embedding(
@@ -79,7 +71,8 @@ def generate_rag_answer(df, user_query, top_n=3, ):
     #     # If there is no "### Grouding data" message, "I could not find a context for the answer." You have to answer. 
     print(content_msg)
 
-    response = client.chat.completions.create(
+    response = gpt_client.embedding_pool.create(
+        "chat",
         model=deployment_name,
         messages=[
             {"role": "system", "content": system_msg},
@@ -0,0 +1,89 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+'''
+GPT 정제 결과 캐시 (게시글 단위)
+- 키: 모델(배포 이름), 시스템 프롬프트, 함수 스키마, 게시글의 Title/Contents/Comments 를 합친 sha256
+  → 프롬프트나 스키마를 고치면 자동으로 새 키가 되고, 배치 구성이 달라져도 게시글 단위로 캐시 적중
+- 값: 게시글 하나의 정제 결과 (content, comments, keywords, tendency) JSON
+- 적중/미적중 통계, talkNo 또는 전체 무효화
+
+사용 예시:
+python gpt_cache.py
+python gpt_cache.py --invalidate 978572 978573
+python gpt_cache.py --clear
+'''
+
+CACHE_FILE = os.path.join("refine_result", "gpt_cache.sqlite")
+
+
+def make_key(*parts):
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                talk_no TEXT,
+                result TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_talk_no ON responses (talk_no)")
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        row = self._db.execute("SELECT result FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, talk_no, result):
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, talk_no, result, created_at) VALUES (?, ?, ?, ?)",
+            (key, str(talk_no), json.dumps(result, ensure_ascii=False), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    def invalidate(self, talk_nos):
+        cursor = self._db.executemany("DELETE FROM responses WHERE talk_no = ?", [(str(talk_no),) for talk_no in talk_nos])
+        return cursor.rowcount
+
+    def clear(self):
+        return self._db.execute("DELETE FROM responses").rowcount
+
+    def size(self):
+        return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"hit {self.hits} / miss {self.misses} ({rate:.1f}%), {self.size()} entries"
+
+    def close(self):
+        self._db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GPT 정제 결과 캐시 관리")
+    parser.add_argument("--path", default=CACHE_FILE)
+    parser.add_argument("--invalidate", nargs="+", metavar="TALK_NO", help="해당 talkNo 의 캐시 삭제")
+    parser.add_argument("--clear", action="store_true", help="캐시 전체 삭제")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path)
+    if args.invalidate:
+        print(f"Invalidated {cache.invalidate(args.invalidate)} entries")
+    if args.clear:
+        print(f"Cleared {cache.clear()} entries")
+    print(f"Cache entries: {cache.size()}")
+    cache.close()
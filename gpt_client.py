@@ -0,0 +1,310 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import httpx
+import openai
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from dotenv import load_dotenv
+from quota_scheduler import QuotaScheduler
+from token_budget import estimate_request_tokens
+
+'''
+GPT 스크립트 공용 Azure OpenAI 클라이언트 풀
+- 여러 엔드포인트(리소스)/배포/키를 등록해 두고 요청마다 하나를 골라 보냄 → 전체 처리량 = 배포들의 할당량 합
+- 응답 헤더(x-ratelimit-remaining-tokens/requests)의 남은 할당량에 비례하는 가중치로 배포 선택
+- 429/5xx/연결 오류면 그 배포를 retry-after(없으면 지수 백오프) 동안 제외하고 다른 배포로 다시 보냄
+- 배포/모델마다 분당 토큰(TPM)/요청(RPM) 한도를 주면 요청의 예상 토큰으로 미리 계산해
+  한도 안에 들어가는 배포로만 보내고, 모두 차 있으면 자리가 날 때까지 기다림 (quota_scheduler)
+- chat() / chat_async() / embed(): client.chat.completions.create, client.embeddings.create 와 같은 인자, 같은 반환값 (stream=True 포함)
+- 임베딩 배포가 다른 리소스(AZURE_OPENAI_ENDPOINT)에 있으면 embed() 는 그 리소스의 풀(embedding_pool)로 보냄
+  (RAG 답변 생성처럼 같은 리소스의 채팅 배포가 필요하면 embedding_pool.create("chat", ...))
+- run_in_order(): 배치 요청을 동시에 최대 concurrency 개까지 보내고, 결과는 입력 순서대로 돌려줌
+
+.env 설정 (기존 설정이 1번, 2번부터는 _2, _3 ... 을 붙여 추가):
+ENDPOINT_URL=...            AZURE_OPENAI_API_KEY=...            DEPLOYMENT_NAME=gpt-4o
+ENDPOINT_URL_2=...          AZURE_OPENAI_API_KEY_2=...          DEPLOYMENT_NAME_2=gpt-4o  (생략하면 DEPLOYMENT_NAME)
+AZURE_OPENAI_QUOTA=gpt-4o=150000/900,gpt-4o-mini=200000/1200     (배포 이름=TPM/RPM, 없는 모델은 제한 없음)
+AZURE_OPENAI_QUOTA_2=...
+AZURE_OPENAI_ENDPOINT=...   OPENAI_API_VERSION=2024-06-01       (임베딩 리소스, 키는 AZURE_OPENAI_API_KEY)
+AZURE_OPENAI_EMBEDDING_QUOTA=text-embedding-3-large=350000/2100
+
+python gpt_client.py 로 등록된 배포 목록 확인
+'''
+
+# .env 파일 로드
+load_dotenv()
+
+endpoint = os.getenv("ENDPOINT_URL")
+deployment = os.getenv("DEPLOYMENT_NAME", "gpt-4o")
+subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
+API_VERSION = "2024-05-01-preview"
+
+MAX_BACKOFF = 60.0  # retry-after 가 없을 때 연속 실패에 따른 제외 시간 상한(초)
+MIN_WEIGHT = 1000.0  # 남은 할당량이 바닥이어도 가끔은 보내서 회복 여부 확인
+
+
+def load_deployments():
+    # 번호 없는 기존 설정부터 ENDPOINT_URL_n 이 없을 때까지 읽음
+    configs = []
+    suffix = ""
+    n = 1
+    while os.getenv("ENDPOINT_URL" + suffix):
+        configs.append({
+            "name": f"{n}:{os.getenv('ENDPOINT_URL' + suffix)}",
+            "endpoint": os.getenv("ENDPOINT_URL" + suffix),
+            "key": os.getenv("AZURE_OPENAI_API_KEY" + suffix),
+            "deployment": os.getenv("DEPLOYMENT_NAME" + suffix, deployment),
+            "quota": parse_quota(os.getenv("AZURE_OPENAI_QUOTA" + suffix, "")),
+        })
+        n += 1
+        suffix = f"_{n}"
+    if not configs:
+        configs.append({"name": "1", "endpoint": endpoint, "key": subscription_key, "deployment": deployment,
+                        "quota": parse_quota(os.getenv("AZURE_OPENAI_QUOTA", ""))})
+    return configs
+
+
+def load_embedding_deployments():
+    # embedding.py 가 쓰던 임베딩 리소스 설정, 없으면 None (기본 풀 사용)
+    if not os.getenv("AZURE_OPENAI_ENDPOINT"):
+        return None
+    return [{"name": f"embedding:{os.getenv('AZURE_OPENAI_ENDPOINT')}",
+             "endpoint": os.getenv("AZURE_OPENAI_ENDPOINT"),
+             "key": os.getenv("AZURE_OPENAI_API_KEY"),
+             "deployment": deployment,
+             "api_version": os.getenv("OPENAI_API_VERSION", API_VERSION),
+             "quota": parse_quota(os.getenv("AZURE_OPENAI_EMBEDDING_QUOTA", ""))}]
+
+
+def parse_quota(value):
+    # "gpt-4o=150000/900,text-embedding-3-large=350000" → {배포 이름: (TPM, RPM)}
+    quota = {}
+    for pair in value.split(","):
+        if "=" not in pair:
+            continue
+        model, limits = pair.split("=", 1)
+        tpm, _, rpm = limits.partition("/")
+        quota[model.strip()] = (int(tpm) if tpm.strip() else None, int(rpm) if rpm.strip() else None)
+    return quota
+
+
+def _header_float(headers, name):
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(headers):
+    # retry-after-ms 가 더 정확하므로 먼저 확인
+    if headers is None:
+        return None
+    ms = _header_float(headers, "retry-after-ms")
+    if ms is not None:
+        return ms / 1000
+    return _header_float(headers, "retry-after")
+
+
+def is_transient(error):
+    # 잠시 뒤 다시 보내면 될 수 있는 오류: 할당량 초과, 5xx, 연결 오류 (스트리밍 도중 끊긴 경우 포함)
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError))
+
+
+def is_content_filter(error):
+    # Azure 콘텐츠 필터가 프롬프트를 거절한 경우 (배치 안의 게시글 하나 때문일 수 있음)
+    return isinstance(error, openai.BadRequestError) and error.code == "content_filter"
+
+
+class Deployment:
+    def __init__(self, name, endpoint, key, deployment, quota=None, api_version=API_VERSION):
+        self.name = name
+        self.deployment = deployment
+        self.quota = quota or {}
+        self.schedulers = {}  # 배포 이름 → QuotaScheduler (할당량은 배포마다 따로)
+        # 재시도는 풀이 다른 배포로 넘기면서 직접 하므로 SDK 재시도는 끔
+        self.client = AzureOpenAI(azure_endpoint=endpoint, api_key=key, api_version=api_version, max_retries=0)
+        self.async_client = AsyncAzureOpenAI(azure_endpoint=endpoint, api_key=key, api_version=api_version, max_retries=0)
+
+        self.remaining_tokens = None
+        self.remaining_requests = None
+        self.blocked_until = 0.0
+        self.failures = 0  # 연속 실패 수
+        self.requests = 0
+        self.errors = 0
+
+    def model(self, model):
+        # 기본 배포 이름으로 요청하면 이 리소스의 배포 이름으로 바꾸고, 다른 이름(gpt-4o-mini, 임베딩)은 그대로 사용
+        return self.deployment if model == deployment else model
+
+    def scheduler(self, model):
+        if model not in self.schedulers:
+            tpm, rpm = self.quota.get(model, (None, None))
+            self.schedulers[model] = QuotaScheduler(tpm, rpm)
+        return self.schedulers[model]
+
+    def weight(self, default):
+        if self.remaining_tokens is None:
+            return default
+        if self.remaining_requests is not None and self.remaining_requests < 1:
+            return MIN_WEIGHT
+        return max(self.remaining_tokens, MIN_WEIGHT)
+
+    def status(self, now=None):
+        now = time.monotonic() if now is None else now
+        state = "ok" if now >= self.blocked_until else f"blocked {self.blocked_until - now:.0f}s"
+        usage = "".join(f", {model} {tokens} tokens/{requests} requests in last minute"
+                        for model, (tokens, requests) in ((m, q.usage()) for m, q in self.schedulers.items()))
+        return (f"{self.name} ({self.deployment}): {state}, {self.requests} requests, {self.errors} errors, "
+                f"remaining tokens {self.remaining_tokens}, requests {self.remaining_requests}{usage}")
+
+
+class DeploymentPool:
+    def __init__(self, configs):
+        self.deployments = [Deployment(**config) for config in configs]
+        self.max_attempts = max(3, 2 * len(self.deployments))
+        self._lock = threading.Lock()
+
+    def _choose(self, model, cost):
+        # 정상이고 이 요청의 예상 토큰이 한도 안에 들어가는 배포를 남은 할당량 가중치로 하나 고르고 한도에 예약,
+        # 그런 배포가 없으면 가장 먼저 자리가 나는 배포까지 기다릴 시간(초)을 반환
+        with self._lock:
+            now = time.monotonic()
+            waits = [max(d.blocked_until - now, d.scheduler(d.model(model)).wait_time(cost, now))
+                     for d in self.deployments]
+            healthy = [d for d, wait in zip(self.deployments, waits) if wait <= 0]
+            if not healthy:
+                return None, min(waits)
+            # 헤더를 아직 못 받은 배포는 가장 여유 있는 배포만큼 있다고 가정
+            known = [d.remaining_tokens for d in healthy if d.remaining_tokens is not None]
+            default = max(known) if known else 1.0
+            chosen = random.choices(healthy, weights=[d.weight(default) for d in healthy])[0]
+            chosen.scheduler(chosen.model(model)).reserve(cost, now)
+            chosen.requests += 1
+            return chosen, 0.0
+
+    def _succeed(self, d, headers):
+        with self._lock:
+            d.failures = 0
+            tokens = _header_float(headers, "x-ratelimit-remaining-tokens")
+            requests = _header_float(headers, "x-ratelimit-remaining-requests")
+            if tokens is not None:
+                d.remaining_tokens = tokens
+            if requests is not None:
+                d.remaining_requests = requests
+
+    def _fail(self, d, model, error):
+        # 다른 배포로 넘길 오류면 True (400 등 요청 자체의 문제는 어느 배포로 보내도 같으므로 False)
+        if not is_transient(error):
+            return False
+        wait = retry_after(error.response.headers) if isinstance(error, openai.APIStatusError) else None
+        with self._lock:
+            d.errors += 1
+            d.failures += 1
+            if wait is None:
+                wait = min(MAX_BACKOFF, 2 ** (d.failures - 1))
+            if isinstance(error, openai.RateLimitError):
+                # 할당량 초과는 그 배포(모델)만 retry-after 동안 멈추고, 같은 리소스의 다른 배포는 계속 사용
+                d.remaining_tokens = 0.0
+                d.scheduler(d.model(model)).pause(wait)
+            else:
+                d.blocked_until = max(d.blocked_until, time.monotonic() + wait)
+        print(f"Deployment {d.name} failed ({error.__class__.__name__}), excluded for {wait:.1f}s")
+        return True
+
+    def create(self, resource, **kwargs):
+        # resource: "chat" 또는 "embeddings"
+        model = kwargs.get("model")
+        cost = estimate_request_tokens(resource, kwargs, model)
+        error = None
+        attempt = 0
+        while attempt < self.max_attempts:
+            d, wait = self._choose(model, cost)
+            if d is None:
+                time.sleep(wait)
+                continue
+            attempt += 1
+            try:
+                raw = _resource(d.client, resource).with_raw_response.create(**dict(kwargs, model=d.model(model)))
+            except Exception as e:
+                if not self._fail(d, model, e):
+                    raise
+                error = e
+                continue
+            self._succeed(d, raw.headers)
+            return raw.parse()
+        raise error
+
+    async def create_async(self, resource, **kwargs):
+        model = kwargs.get("model")
+        cost = estimate_request_tokens(resource, kwargs, model)
+        error = None
+        attempt = 0
+        while attempt < self.max_attempts:
+            d, wait = self._choose(model, cost)
+            if d is None:
+                await asyncio.sleep(wait)
+                continue
+            attempt += 1
+            try:
+                raw = await _resource(d.async_client, resource).with_raw_response.create(**dict(kwargs, model=d.model(model)))
+            except Exception as e:
+                if not self._fail(d, model, e):
+                    raise
+                error = e
+                continue
+            self._succeed(d, raw.headers)
+            return raw.parse()
+        raise error
+
+    def status(self):
+        now = time.monotonic()
+        return "\n".join(d.status(now) for d in self.deployments)
+
+
+def _resource(client, resource):
+    return client.chat.completions if resource == "chat" else client.embeddings
+
+
+pool = DeploymentPool(load_deployments())
+_embedding_configs = load_embedding_deployments()
+embedding_pool = DeploymentPool(_embedding_configs) if _embedding_configs else pool
+
+
+def chat(**kwargs):
+    return pool.create("chat", **kwargs)
+
+
+async def chat_async(**kwargs):
+    return await pool.create_async("chat", **kwargs)
+
+
+def embed(**kwargs):
+    return embedding_pool.create("embeddings", **kwargs)
+
+
+async def run_in_order(jobs, worker, concurrency):
+    # 모든 job 을 바로 시작하되 세마포어로 동시 요청 수를 제한하고, 끝난 순서와 관계없이 입력 순서대로 yield
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(job):
+        async with semaphore:
+            return await worker(job)
+
+    tasks = [asyncio.create_task(limited(job)) for job in jobs]
+    try:
+        for job, task in zip(jobs, tasks):
+            yield job, await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+if __name__ == "__main__":
+    print(f"{len(pool.deployments)} deployments")
+    print(pool.status())
+    if embedding_pool is not pool:
+        print(embedding_pool.status())
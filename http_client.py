@@ -0,0 +1,205 @@
+import asyncio
+import os
+import random
+import time
+import httpx
+from rate_limiter import AdaptiveRateLimiter
+from page_archive import PageArchive
+
+'''
+크롤러 공용 HTTP 클라이언트
+- keep-alive 커넥션 풀 재사용 (게시글마다 TCP/TLS 핸드셰이크 반복 방지)
+- HTTP/2 (CRAWLER_HTTP2=1 이고 h2 패키지가 있을 때)
+- gzip/brotli 압축 응답 (brotli 패키지가 있을 때 br 협상)
+- 타임아웃과 지터가 섞인 지수 백오프 재시도
+- 모든 요청은 공용 AIMD 속도 제한기(limiter)를 거침 (CRAWLER_RATE 로 시작 속도 설정)
+- CRAWLER_ARCHIVE=1 이면 응답을 page_archive 에 저장하고 재요청은 조건부 GET(304 → 아카이브 본문)
+- 벤치마크용: CRAWLER_URL_REWRITE 로 요청 주소를 로컬 서버로 바꾸고, CRAWLER_TRACE 파일에 요청별 지연시간 기록
+'''
+
+DEFAULT_HEADERS = {'User-Agent' : 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)AppleWebKit/537.36 (KHTML, like Gecko) Chrome/73.0.3683.86 Safari/537.36'}
+
+TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # 초
+BACKOFF_CAP = 10.0  # 초
+RETRY_STATUS = {429, 500, 502, 503, 504}
+POOL_SIZE = 20
+
+try:
+    import brotli  # noqa: F401  (httpx 가 br 응답을 풀 때 사용)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# "원래 주소=바꿀 주소" 를 쉼표로 나열 (예: https://www.albamon.com=http://127.0.0.1:8765)
+URL_REWRITES = [tuple(pair.split("=", 1)) for pair in os.getenv("CRAWLER_URL_REWRITE", "").split(",") if "=" in pair]
+TRACE_FILE = os.getenv("CRAWLER_TRACE")
+
+_client = None
+_archive = None
+_trace_file = None
+
+# 모든 크롤러가 공유하는 요청 속도 제어기
+limiter = AdaptiveRateLimiter(rate=float(os.getenv("CRAWLER_RATE", "5")),
+                              max_rate=float(os.getenv("CRAWLER_MAX_RATE", "50")))
+
+
+def http2_enabled():
+    if os.getenv("CRAWLER_HTTP2", "0") != "1":
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        print("⚠️ h2 패키지가 없어 HTTP/1.1 로 요청합니다. (pip install 'httpx[http2]')")
+        return False
+
+
+def _client_options(pool_size):
+    return {
+        "headers": {**DEFAULT_HEADERS, "Accept-Encoding": ACCEPT_ENCODING},
+        "timeout": TIMEOUT,
+        "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        "http2": http2_enabled(),
+        "follow_redirects": True,
+    }
+
+
+def get_client():
+    # 프로세스 전체에서 하나의 커넥션 풀을 공유
+    global _client
+    if _client is None:
+        _client = httpx.Client(**_client_options(POOL_SIZE))
+    return _client
+
+
+def close():
+    global _client, _archive, _trace_file
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _archive is not None:
+        _archive.close()
+        _archive = None
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+def get_archive():
+    global _archive
+    if _archive is None and os.getenv("CRAWLER_ARCHIVE", "0") == "1":
+        _archive = PageArchive()
+    return _archive
+
+
+def rewrite_url(url):
+    for prefix, replacement in URL_REWRITES:
+        if url.startswith(prefix):
+            return replacement + url[len(prefix):]
+    return url
+
+
+def _trace(url, status, latency):
+    # 요청 한 건(재시도 포함)의 "지연시간(초)\t상태 코드\tURL" 을 한 줄씩 기록
+    global _trace_file
+    if TRACE_FILE is None:
+        return
+    if _trace_file is None:
+        _trace_file = open(TRACE_FILE, 'a', encoding='utf-8', buffering=1)
+    _trace_file.write(f"{latency:.6f}\t{status}\t{url}\n")
+
+
+def _with_conditional_headers(url, headers):
+    archive = get_archive()
+    if archive is None:
+        return headers
+    return {**(headers or {}), **archive.conditional_headers(url)}
+
+
+def _archive_response(url, response):
+    # 200 이면 저장, 304 면 아카이브에 있는 본문으로 응답을 만들어 반환
+    archive = get_archive()
+    if archive is None:
+        return response
+    if response.status_code == 200:
+        archive.store(url, response.status_code, response.content, response.headers)
+    elif response.status_code == 304:
+        entry = archive.lookup(url)
+        if entry is not None:
+            headers = {"content-type": entry["content_type"]} if entry["content_type"] else {}
+            return httpx.Response(entry["status"], content=archive.read(entry["sha256"]),
+                                  headers=headers, request=response.request)
+    return response
+
+
+def create_async_client(pool_size=POOL_SIZE):
+    return httpx.AsyncClient(**_client_options(pool_size))
+
+
+def backoff_delay(attempt, response=None):
+    # 서버가 Retry-After 를 주면 우선, 아니면 full jitter 지수 백오프
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def fetch(url, headers=None, **kwargs):
+    # 재시도 후에도 실패한 상태 코드는 응답 그대로 반환, 네트워크 오류는 예외 발생
+    client = get_client()
+    url = rewrite_url(url)
+    headers = _with_conditional_headers(url, headers)
+    request_started = time.monotonic()
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = client.get(url, headers=headers, **kwargs)
+        except httpx.TransportError as e:
+            limiter.record(error=True)
+            if attempt == MAX_RETRIES:
+                _trace(url, "error", time.monotonic() - request_started)
+                raise
+            delay = backoff_delay(attempt)
+            print(f"⚠️ 요청 오류 ({e.__class__.__name__}), {delay:.1f}초 후 재시도: {url}")
+            time.sleep(delay)
+            continue
+
+        limiter.record(response.status_code, time.monotonic() - started)
+        if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+            _trace(url, response.status_code, time.monotonic() - request_started)
+            return _archive_response(url, response)
+        delay = backoff_delay(attempt, response)
+        print(f"⚠️ 상태 코드 {response.status_code}, {delay:.1f}초 후 재시도: {url}")
+        time.sleep(delay)
+
+
+async def fetch_async(client, url, headers=None, **kwargs):
+    url = rewrite_url(url)
+    headers = _with_conditional_headers(url, headers)
+    request_started = time.monotonic()
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.acquire_async()
+        started = time.monotonic()
+        try:
+            response = await client.get(url, headers=headers, **kwargs)
+        except httpx.TransportError as e:
+            limiter.record(error=True)
+            if attempt == MAX_RETRIES:
+                _trace(url, "error", time.monotonic() - request_started)
+                raise
+            delay = backoff_delay(attempt)
+            print(f"⚠️ 요청 오류 ({e.__class__.__name__}), {delay:.1f}초 후 재시도: {url}")
+            await asyncio.sleep(delay)
+            continue
+
+        limiter.record(response.status_code, time.monotonic() - started)
+        if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+            _trace(url, response.status_code, time.monotonic() - request_started)
+            return _archive_response(url, response)
+        delay = backoff_delay(attempt, response)
+        print(f"⚠️ 상태 코드 {response.status_code}, {delay:.1f}초 후 재시도: {url}")
+        await asyncio.sleep(delay)
@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+'''
+원본 응답 아카이브 (content-addressed)
+- 응답 본문은 sha256 으로 이름 붙인 gzip 파일로 저장 (같은 내용은 한 번만 저장)
+- URL → sha256, ETag, Last-Modified, Content-Type 을 SQLite 인덱스에 기록
+- http_client 가 재요청 시 If-None-Match / If-Modified-Since 를 보내고 304 면 아카이브 본문 사용
+- 파서를 고친 뒤에는 --reparse-from-archive 로 네트워크 없이 CSV 재생성
+'''
+
+ARCHIVE_DIR = os.path.join("crawling_result", "archive")
+
+
+class PageArchive:
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite"), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at TEXT NOT NULL
+            )""")
+
+    def _object_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], sha256 + ".gz")
+
+    def lookup(self, url):
+        row = self._db.execute(
+            "SELECT sha256, status, content_type, etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("sha256", "status", "content_type", "etag", "last_modified"), row))
+
+    def read(self, sha256):
+        with gzip.open(self._object_path(sha256), 'rb') as f:
+            return f.read()
+
+    def store(self, url, status, content, headers):
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with gzip.open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages (url, sha256, status, content_type, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, sha256, status, headers.get("content-type"), headers.get("etag"), headers.get("last-modified"),
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    def conditional_headers(self, url):
+        entry = self.lookup(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def iter_pages(self, prefix):
+        # prefix 로 시작하는 URL 의 (url, 메타데이터) 목록
+        rows = self._db.execute(
+            "SELECT url, sha256, status, content_type FROM pages WHERE url LIKE ? ESCAPE '\\' ORDER BY url",
+            (prefix.replace("%", r"\%").replace("_", r"\_") + "%",)).fetchall()
+        for url, sha256, status, content_type in rows:
+            yield url, {"sha256": sha256, "status": status, "content_type": content_type}
+
+    def read_text(self, entry):
+        # Content-Type 의 charset 으로 디코딩 (없으면 utf-8)
+        charset = "utf-8"
+        content_type = entry.get("content_type") or ""
+        if "charset=" in content_type:
+            charset = content_type.split("charset=")[-1].split(";")[0].strip()
+        return self.read(entry["sha256"]).decode(charset, errors="replace")
+
+    def close(self):
+        self._db.close()
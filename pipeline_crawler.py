@@ -0,0 +1,127 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+import httpx
+import http_client
+from detail_parser import parse_detail, to_post_row
+from talk_index import MISSING_STATUS
+
+'''
+파이프라인 상세 크롤러
+- fetcher(비동기) → HTML 큐 → 파서 프로세스 풀 → 결과 큐 → writer(1개)
+- 모든 큐는 크기가 정해져 있어 파싱이 밀리면 fetcher 가, 기록이 밀리면 파서가 기다림 (메모리 일정)
+- 파싱은 ProcessPoolExecutor 에서 실행되어 GIL 에 막히지 않고 코어 수만큼 확장
+- writer 는 talkNo 순서대로 저널에 기록 (먼저 끝난 결과는 잠시 보관)
+  · producer 는 아직 기록되지 않은 talkNo 가 window 개가 되면 기다리므로, 한 talkNo 가 재시도로 늦어져도 보관량은 window 개 이하
+- talk_index 의 missing talkNo 는 요청하지 않고, 제목이 없는 페이지는 missing 으로 기록
+'''
+
+DETAIL_URL = 'https://www.albamon.com/alba-talk/experience/{talk_no}?sortType=CREATED_DATE'
+
+
+def parse_post(talk_no, content, encoding):
+    # 프로세스 풀에서 실행 (pickle 가능한 최상위 함수)
+    detail = parse_detail(content.decode(encoding or 'utf-8', errors='replace'))
+    if not detail["title"]:
+        return None
+    return to_post_row(talk_no, detail)
+
+
+async def _produce(talk_nos, id_queue, n_fetchers, window):
+    for seq, talk_no in enumerate(talk_nos):
+        await window.acquire()
+        await id_queue.put((seq, talk_no))
+    for _ in range(n_fetchers):
+        await id_queue.put(None)
+
+
+async def _fetch(client, id_queue, html_queue):
+    while True:
+        item = await id_queue.get()
+        if item is None:
+            return
+        seq, talk_no = item
+        try:
+            response = await http_client.fetch_async(client, DETAIL_URL.format(talk_no=talk_no))
+            await html_queue.put((seq, talk_no, response.content, response.encoding, response.status_code))
+        except httpx.HTTPError as e:
+            print(f"❌ talkNo {talk_no} 요청 실패: {e}")
+            await html_queue.put((seq, talk_no, None, None, None))
+
+
+async def _parse(pool, html_queue, result_queue):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await html_queue.get()
+        if item is None:
+            return
+        seq, talk_no, content, encoding, status_code = item
+        if content is None:
+            await result_queue.put((seq, talk_no, None, None))
+            continue
+        try:
+            row = await loop.run_in_executor(pool, parse_post, talk_no, content, encoding)
+        except Exception as e:
+            print(f"❌ talkNo {talk_no} 파싱 실패: {e}")
+            await result_queue.put((seq, talk_no, None, None))
+            continue
+        await result_queue.put((seq, talk_no, status_code, row))
+
+
+async def _write(result_queue, journal, progress, index, window):
+    # 결과를 순서대로 저널에 기록, 요청이 실패한 talkNo(연결 오류, 재시도 뒤에도 429/5xx)는 기록하지 않아 --resume 때 다시 시도
+    # 기록하지 못한 talkNo 수를 반환
+    pending = {}
+    next_seq = 0
+    failed = 0
+    while True:
+        item = await result_queue.get()
+        if item is None:
+            return failed
+        pending[item[0]] = item
+        while next_seq in pending:
+            _, talk_no, status_code, row = pending.pop(next_seq)
+            if row is not None:
+                journal.record(talk_no, row)
+                progress.tick()
+            elif status_code in MISSING_STATUS:
+                index.mark_missing(talk_no, status_code)
+                journal.record(talk_no)
+                progress.tick(saved=False)
+            else:
+                failed += 1
+                progress.tick(saved=False)
+            next_seq += 1
+            window.release()
+
+
+async def run_pipeline(talk_nos, journal, progress, index, concurrency=10, workers=None, queue_size=100):
+    workers = workers or os.cpu_count() or 1
+    n_parsers = workers * 2  # 프로세스 풀이 쉬지 않도록 작업을 조금 더 넣어둠
+
+    id_queue = asyncio.Queue(maxsize=queue_size)
+    html_queue = asyncio.Queue(maxsize=queue_size)
+    result_queue = asyncio.Queue(maxsize=queue_size)
+    # 큐와 작업자에 동시에 있을 수 있는 만큼만 기록 순서보다 앞서 보냄 (처리량은 그대로, 보관량은 제한)
+    window = asyncio.Semaphore(3 * queue_size + concurrency + n_parsers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with http_client.create_async_client(concurrency) as client:
+            writer = asyncio.create_task(_write(result_queue, journal, progress, index, window))
+            parsers = [asyncio.create_task(_parse(pool, html_queue, result_queue)) for _ in range(n_parsers)]
+            fetchers = [asyncio.create_task(_fetch(client, id_queue, html_queue)) for _ in range(concurrency)]
+
+            await _produce(talk_nos, id_queue, concurrency, window)
+            await asyncio.gather(*fetchers)
+            for _ in range(n_parsers):
+                await html_queue.put(None)
+            await asyncio.gather(*parsers)
+            await result_queue.put(None)
+            return await writer
+
+
+def crawl_post_detail_pipeline(start_talk_no, stop_talk_no, journal, progress, index, concurrency=10, workers=None, queue_size=100):
+    # 저널에 이미 기록된 talkNo(--resume)와 missing talkNo 는 건너뛰기, 확인하지 못한 talkNo 수를 반환
+    talk_nos = (talk_no for talk_no in range(start_talk_no, stop_talk_no, -1)
+                if not journal.is_done(talk_no) and not index.is_missing(talk_no))
+    return asyncio.run(run_pipeline(talk_nos, journal, progress, index, concurrency, workers, queue_size))
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import deque
+
+'''
+분당 토큰(TPM)/요청(RPM) 한도 안에서만 요청을 내보내는 스케줄러 (배포/모델 하나당 하나)
+- 요청마다 예상 토큰(입력 + 최대 출력)을 미리 계산해 최근 window 초 동안 보낸 양에 더해보고,
+  한도를 넘으면 가장 오래된 요청이 창에서 빠져 자리가 날 때까지 기다릴 시간을 알려줌
+- Azure 도 요청을 받을 때 입력 + max_tokens 로 할당량을 차감하므로 같은 방식으로 세야 429 가 나지 않음
+- pause(): 429 의 retry-after 동안은 한도와 관계없이 보내지 않음
+- 대기/예약은 gpt_client 의 DeploymentPool 이 배포를 고를 때 함께 처리 (sleep 은 호출한 쪽에서)
+'''
+class QuotaScheduler:
+    def __init__(self, tpm=None, rpm=None, window=60.0):
+        self.tpm = tpm
+        self.rpm = rpm
+        self.window = window
+        self._sent = deque()  # (보낸 시각, 예상 토큰)
+        self._tokens = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._sent and self._sent[0][0] <= now - self.window:
+            self._tokens -= self._sent.popleft()[1]
+
+    def wait_time(self, cost, now=None):
+        # cost 토큰짜리 요청을 지금 보내려면 기다려야 할 시간(초), 0 이면 바로 보낼 수 있음
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self._prune(now)
+            wait = self._paused_until - now
+            if self.rpm is not None and len(self._sent) >= self.rpm:
+                wait = max(wait, self._sent[len(self._sent) - self.rpm][0] + self.window - now)
+            if self.tpm is not None and self._sent and self._tokens + cost > self.tpm:
+                # 오래된 요청부터 빠지면서 자리가 나는 시점 (한도보다 큰 요청은 창이 다 비워질 때)
+                need = self._tokens + cost - self.tpm
+                freed = 0
+                for sent_at, tokens in self._sent:
+                    freed += tokens
+                    if freed >= need:
+                        break
+                wait = max(wait, sent_at + self.window - now)
+            return max(wait, 0.0)
+
+    def reserve(self, cost, now=None):
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self._sent.append((now, cost))
+            self._tokens += cost
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def usage(self):
+        with self._lock:
+            self._prune(time.monotonic())
+            return self._tokens, len(self._sent)
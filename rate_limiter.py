@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+'''
+AIMD 방식의 적응형 토큰 버킷
+- 초당 rate 개의 토큰이 채워지고 요청마다 토큰 1개를 사용
+- 응답이 정상이면 adjust_interval 마다 rate 를 additive_step 만큼 올림
+- 429/5xx, 네트워크 오류, 평소보다 latency_factor 배 이상 느린 응답이면 rate 를 decrease_factor 배로 줄임
+- effective_rate(): 최근 window 초 동안 실제로 나간 요청 수 / 초
+'''
+class AdaptiveRateLimiter:
+    def __init__(self, rate=5.0, min_rate=0.5, max_rate=50.0, additive_step=0.5,
+                 decrease_factor=0.5, latency_factor=2.0, adjust_interval=1.0,
+                 window=10.0, report_interval=30.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.adjust_interval = adjust_interval
+        self.window = window
+        self.report_interval = report_interval
+
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._last_adjust = self._updated
+        self._last_decrease = self._updated - adjust_interval
+        self._last_report = self._updated
+        self._baseline_latency = None  # 느린 EWMA (평소 응답 시간)
+        self._sent = deque()  # 최근 요청 시각
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # 토큰을 하나 예약하고 기다려야 할 시간(초)을 반환
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+            self._sent.append(now + wait)
+            while self._sent and self._sent[0] < now - self.window:
+                self._sent.popleft()
+            return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, status_code=None, latency=None, error=False):
+        # 요청 결과를 반영해 rate 를 조절
+        with self._lock:
+            now = time.monotonic()
+            throttled = error or status_code == 429 or (status_code is not None and status_code >= 500)
+
+            slow = False
+            if latency is not None:
+                if self._baseline_latency is None:
+                    self._baseline_latency = latency
+                slow = latency > self._baseline_latency * self.latency_factor
+                self._baseline_latency = 0.95 * self._baseline_latency + 0.05 * latency
+
+            # 감소는 즉시(동시 실패로 연속 감소하지 않도록 adjust_interval 당 1회), 증가는 adjust_interval 마다
+            if throttled or slow:
+                if now - self._last_decrease >= self.adjust_interval:
+                    old_rate = self.rate
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self._last_decrease = self._last_adjust = now
+                    reason = f"상태 코드 {status_code}" if throttled and status_code else ("오류" if error else "응답 지연")
+                    print(f"🐢 요청 속도 감소 ({reason}): {old_rate:.2f} → {self.rate:.2f} req/s")
+            elif now - self._last_adjust >= self.adjust_interval:
+                self.rate = min(self.max_rate, self.rate + self.additive_step)
+                self._last_adjust = now
+
+            if now - self._last_report >= self.report_interval:
+                self._last_report = now
+                print(f"📈 {self._report(now)}")
+
+    def _effective_rate(self, now):
+        recent = [t for t in self._sent if now - self.window <= t <= now]
+        return len(recent) / self.window
+
+    def _report(self, now):
+        return f"요청 속도 설정 {self.rate:.2f} req/s, 실제 {self._effective_rate(now):.2f} req/s"
+
+    def effective_rate(self):
+        with self._lock:
+            return self._effective_rate(time.monotonic())
+
+    def report(self):
+        with self._lock:
+            return self._report(time.monotonic())
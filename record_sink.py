@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import time
+
+'''
+크롤링 결과 스트리밍 저장
+- 게시글을 리스트에 모아두지 않고 도착하는 대로 CSV/JSONL 파일에 기록
+- flush_every 개마다 flush 하여 중간에 죽어도 그때까지의 결과는 남음
+- CSV 의 리스트 값(Comments)은 pandas.to_csv 와 같은 형식("['a', 'b']")으로 기록
+'''
+class RecordSink:
+    def __init__(self, path, fieldnames=None, fmt=None, append=False, flush_every=100):
+        self.path = path
+        self.fmt = fmt or ("jsonl" if path.endswith(".jsonl") else "csv")
+        self.fieldnames = fieldnames
+        self.flush_every = flush_every
+        self.count = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if self.fmt == "csv":
+            # 이어 쓰는 경우 BOM/헤더를 다시 쓰지 않음
+            self._file = open(path, 'a' if exists else 'w', encoding='utf-8' if exists else 'utf-8-sig', newline='')
+            self._writer = None
+            self._header_written = exists
+            if exists and self.fieldnames is None:
+                with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                    self.fieldnames = next(csv.reader(f))
+        else:
+            self._file = open(path, 'a' if exists else 'w', encoding='utf-8')
+
+    def _csv_value(self, value):
+        if isinstance(value, (list, dict)):
+            return str(value)
+        return value
+
+    def write(self, row):
+        if self.fmt == "csv":
+            if self._writer is None:
+                if self.fieldnames is None:
+                    self.fieldnames = list(row.keys())
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+                if not self._header_written:
+                    self._writer.writeheader()
+                    self._header_written = True
+            self._writer.writerow({key: self._csv_value(value) for key, value in row.items()})
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            if self.fmt == "csv" and not self._header_written and self.fieldnames:
+                csv.writer(self._file).writerow(self.fieldnames)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+'''
+게시글마다 출력하는 대신 interval 초마다 진행 상황/처리량 한 줄 출력
+'''
+class ProgressReporter:
+    def __init__(self, label, interval=10.0):
+        self.label = label
+        self.interval = interval
+        self.count = 0
+        self.saved = 0
+        self._started = time.monotonic()
+        self._last_report = self._started
+
+    def tick(self, saved=True):
+        self.count += 1
+        if saved:
+            self.saved += 1
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._print(now)
+
+    def _print(self, now):
+        elapsed = max(now - self._started, 1e-9)
+        print(f"📊 {self.label}: {self.count}건 처리, {self.saved}건 저장, {self.count / elapsed:.1f}건/초, 경과 {elapsed:.0f}초")
+
+    def done(self):
+        self._print(time.monotonic())
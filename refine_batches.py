@@ -0,0 +1,195 @@
+import asyncio
+from datetime import datetime
+import pandas as pd
+import gpt_client
+from gpt_client import deployment
+from token_budget import count_tokens, pack_batches
+from gpt_cache import ResponseCache
+from record_sink import RecordSink
+from refine_output import RefineOutput, to_output_row
+
+'''
+GPT 정제 배치 처리 (csv_post_processor, csv_post_processor_function_calling 공용)
+- 처리기(fmt, 처리기 모듈)는 출력 형식마다 다른 부분만 제공:
+  request_args(prompt, stream), response_text(response), delta_text(chunk), build_prompt(df_input, rows),
+  parse_result(result, df_input, rows), match_items(items, df_input, rows), StreamParser, cache_key(df_input, j)
+- 이미 저장했거나 캐시된 게시글은 건너뛰고, 나머지는 토큰 예산만큼씩 배치로 묶어 최대 concurrency 개를 동시에 요청
+- 게시글은 받는 대로(스트리밍이면 완성되는 대로) 캐시와 .partial 출력에 저장하고, 끝나면 입력 순서로 정렬해 교체
+- 빠진 게시글만 다시 요청하고, 콘텐츠 필터 거절/형식 오류는 배치를 반으로 나눠 재시도, 끝내 실패한 게시글은 dead letter
+- 일시적인 오류는 백오프 후 남은 게시글을 다시 요청하고, 계속되거나 인증/설정 오류면 멈춤 (다음 실행에서 이어서 처리)
+'''
+
+# 배치 토큰 예산 (응답이 MAX_TOKENS 에서 잘리지 않도록 출력 예산에 여유를 둠)
+MAX_TOKENS = 8000
+BATCH_INPUT_TOKENS = 12000
+BATCH_OUTPUT_TOKENS = 6000
+MAX_BATCH_POSTS = 50
+MAX_ATTEMPTS = 3  # 빠진 게시글만 다시 요청하는 횟수 포함
+RETRY_BACKOFF = 5  # 일시적인 오류 뒤 배치를 다시 보내기 전 대기(초), 시도마다 두 배
+BATCH_PAUSE = 1  # 동시 요청 없이 처리할 때 배치 사이 대기(초)
+
+
+async def request_text(fmt, prompt):
+    # 콘텐츠 필터 등으로 거부되면 예외가 그대로 올라감 (process_batch 에서 배치를 나눠 재시도)
+    response = await gpt_client.chat_async(**fmt.request_args(prompt))
+    return fmt.response_text(response)
+
+
+async def stream_text(fmt, prompt):
+    # 응답을 도착하는 조각 단위로 yield
+    async for chunk in await gpt_client.chat_async(**fmt.request_args(prompt, stream=True)):
+        text = fmt.delta_text(chunk)
+        if text:
+            yield text
+
+
+def store_posts(fmt, posts, df_input, output, cache=None):
+    # 배치의 게시글만 입력 순서대로 출력 파일에 이어쓰기 (전체 파일을 다시 쓰지 않음)
+    rows = sorted(posts)
+    if cache is not None:
+        for df_idx in rows:
+            cache.put(fmt.cache_key(df_input, df_idx), df_input.iloc[df_idx]['talkNo'], posts[df_idx])
+    output.write([to_output_row(df_input.iloc[df_idx], posts[df_idx]) for df_idx in rows])
+    print(f"Saved {len(rows)} rows to {output.partial_file}")
+
+
+def commit_new(new_posts, posts, commit):
+    new_posts = {df_idx: post for df_idx, post in new_posts.items() if df_idx not in posts}
+    if new_posts:
+        posts.update(new_posts)
+        commit(new_posts)
+
+
+async def request_posts(fmt, df_input, rows, posts, commit, stream):
+    # 한 번 요청해서 새로 받은 유효한 게시글을 posts 에 더하고 바로 commit (스트리밍이면 게시글 하나가 완성될 때마다)
+    prompt = fmt.build_prompt(df_input, rows)
+    if not stream:
+        result = await request_text(fmt, prompt)
+        commit_new(fmt.parse_result(result, df_input, rows) if result else {}, posts, commit)
+        return
+    parser = fmt.StreamParser()
+    async for text in stream_text(fmt, prompt):
+        commit_new(fmt.match_items(parser.feed(text), df_input, rows), posts, commit)
+    commit_new(fmt.match_items(parser.close(), df_input, rows), posts, commit)
+
+
+def record_dead_letter(dead_letter, df_input, df_idx, error):
+    # pandas 가 읽은 talkNo 는 numpy.int64 라 json 으로 쓸 수 있게 int 로 변환
+    dead_letter.write({
+        "talkNo": int(df_input.iloc[df_idx]['talkNo']),
+        "row": df_idx + 1,
+        "error": error,
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    print(f"Dead letter: row {df_idx + 1} (talkNo {df_input.iloc[df_idx]['talkNo']}): {error}")
+
+
+async def process_batch(fmt, df_input, rows, dead_letter, commit, stream=False):
+    # 빠졌거나 형식이 틀린 게시글만 모아서 다시 요청
+    posts = {}
+    pending = rows
+    error = None
+    for attempt in range(MAX_ATTEMPTS):
+        found = len(posts)
+        try:
+            await request_posts(fmt, df_input, pending, posts, commit, stream)
+        except Exception as e:
+            # 스트리밍 중에 끊겨도 그 전에 완성된 게시글은 이미 저장됨
+            pending = [j for j in pending if j not in posts]
+            if not pending:
+                return posts
+            if gpt_client.is_transient(e) and attempt + 1 < MAX_ATTEMPTS:
+                wait = RETRY_BACKOFF * 2 ** attempt
+                print(f"Error processing row {pending[0]}: {e}, retrying in {wait}s")
+                await asyncio.sleep(wait)
+                continue
+            if not gpt_client.is_content_filter(e):
+                # 장애가 계속되거나 키/배포 설정 오류면 나눠 보내도 모두 실패하므로 멈춤 (다음 실행에서 이어서 처리)
+                raise
+            # 콘텐츠 필터 거절은 일부 게시글 때문일 수 있으므로 나눠서 다시 요청
+            print(f"Content filter rejected batch starting at row {pending[0]}: {e}")
+            error = str(e)
+            break
+        pending = [j for j in pending if j not in posts]
+        if not pending:
+            return posts
+        if len(posts) == found:
+            error = "no valid post in response"
+            break
+        error = f"missing from response after {attempt + 1} attempts"
+        print(f"Missing {len(pending)} of {len(rows)} posts in batch starting at row {rows[0]}, attempt {attempt + 1}")
+
+    # 실패한 게시글은 반으로 나눠 차례로 다시 요청하고(동시 요청 수 제한 유지), 하나만 남아도 실패하면 dead letter 로 기록
+    if not pending:
+        return posts
+    if len(pending) == 1:
+        record_dead_letter(dead_letter, df_input, pending[0], error)
+        return posts
+    half = len(pending) // 2
+    print(f"Splitting {len(pending)} failed posts starting at row {pending[0]}")
+    posts.update(await process_batch(fmt, df_input, pending[:half], dead_letter, commit, stream))
+    posts.update(await process_batch(fmt, df_input, pending[half:], dead_letter, commit, stream))
+    return posts
+
+
+async def process_batches(fmt, batches, df_input, output, concurrency, cache, dead_letter, stream):
+    # 배치는 동시에 요청하고 게시글은 받는 대로 저장 (출력 순서는 finalize 에서 입력 순서로 정렬)
+    def commit(posts):
+        store_posts(fmt, posts, df_input, output, cache)
+
+    async def request(rows):
+        print(f"Processing batch: rows {rows[0]+1} to {rows[-1]+1}")
+        posts = await process_batch(fmt, df_input, rows, dead_letter, commit, stream)
+        if concurrency == 1:
+            # API 호출 제한을 위한 대기
+            await asyncio.sleep(BATCH_PAUSE)
+        return posts
+
+    async for rows, posts in gpt_client.run_in_order(batches, request, concurrency):
+        print(f"Batch done: rows {rows[0]+1} to {rows[-1]+1} ({len(posts)} of {len(rows)} posts)")
+
+
+def process_csv(fmt, input_file, output_file, concurrency=1, use_cache=True, fresh=False, stream=False):
+    # CSV 파일 읽기
+    df_input = pd.read_csv(input_file,
+                encoding='utf-8',
+                quotechar='"',  # 따옴표 문자 지정
+                doublequote=True,  # 이중 따옴표 처리
+                lineterminator='\n'  # 줄바꿈 문자 지정
+                )
+
+    # 이전 실행에서 이미 저장한 id 는 건너뛰고 새 결과만 이어쓰기
+    output = RefineOutput(output_file, fresh)
+    pending = [j for j in range(len(df_input)) if not output.is_done(df_input.iloc[j]['talkNo'])]
+
+    # 입력이 같은 게시글은 캐시된 결과를 바로 사용하고, 나머지만 GPT 로 요청
+    cache = ResponseCache() if use_cache else None
+    if cache is not None:
+        cached = {j: cache.get(fmt.cache_key(df_input, j)) for j in pending}
+        pending = [j for j in pending if cached[j] is None]
+        hit_rows = [j for j in cached if cached[j] is not None]
+        if hit_rows:
+            store_posts(fmt, {j: cached[j] for j in hit_rows}, df_input, output)
+
+    # 게시글 길이(댓글 포함)에 맞춰 토큰 예산을 채우는 만큼씩 배치 구성
+    post_tokens = [count_tokens(fmt.build_prompt(df_input, [j]), deployment) for j in pending]
+    batches = [pending[start:end] for start, end in
+               pack_batches(post_tokens, BATCH_INPUT_TOKENS, BATCH_OUTPUT_TOKENS, MAX_BATCH_POSTS)]
+    print(f"{len(pending)} posts packed into {len(batches)} batches ({len(df_input) - len(pending)} done or cached)")
+
+    # 끝내 처리하지 못한 게시글과 오류 (다음 실행에서 다시 시도됨)
+    dead_letter = RecordSink(output_file + ".dead_letter.jsonl", fmt="jsonl", append=True, flush_every=1)
+
+    # concurrency 가 2 이상이면 여러 배치를 동시에 요청 (대기 시간 대신 할당량이 처리 속도를 결정)
+    asyncio.run(process_batches(fmt, batches, df_input, output, concurrency, cache, dead_letter, stream))
+
+    dead_letter.close()
+    if dead_letter.count:
+        print(f"{dead_letter.count} posts failed, see {dead_letter.path}")
+    if cache is not None:
+        print(f"Cache: {cache.stats()}")
+        cache.close()
+
+    # 모든 배치가 끝나면 입력 순서로 정렬해 출력 파일과 한 번에 교체
+    count = output.finalize(df_input['talkNo'].tolist())
+    print(f"Processing complete. {count} rows saved to {output_file}")
@@ -0,0 +1,89 @@
+import csv
+import os
+import shutil
+from record_sink import RecordSink
+
+'''
+GPT 정제 결과 이어쓰기 저장
+- 배치가 끝날 때마다 전체 파일을 다시 쓰지 않고 <output>.partial 에 새 행만 append + flush
+- 다시 실행하면 .partial (없으면 기존 출력 파일)에 있는 id 는 건너뛰고 남은 게시글만 처리
+- finalize(): 입력 순서대로 정렬해 임시 파일에 쓴 뒤 os.replace 로 출력 파일과 교체 (중간 상태의 출력 파일이 생기지 않음)
+'''
+
+OUTPUT_FIELDS = ['id', 'content', 'comments', 'keywords', 'tendency', 'views', 'date']
+
+
+def id_key(value):
+    # id 는 978572, "978572", "978572.0" 어느 형태로 와도 같은 키
+    try:
+        return str(int(float(value)))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _read_rows(path):
+    # 중간에 끊겨 필드가 모자란 마지막 행은 버림
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return [row for row in csv.DictReader(f) if None not in row.values() and row.get('id')]
+
+
+def _write_rows(path, rows):
+    tmp_file = path + ".tmp"
+    with RecordSink(tmp_file, fieldnames=OUTPUT_FIELDS, fmt="csv") as sink:
+        for row in rows:
+            sink.write(row)
+    os.replace(tmp_file, path)
+
+
+class RefineOutput:
+    def __init__(self, output_file, fresh=False):
+        self.output_file = output_file
+        self.partial_file = output_file + ".partial"
+
+        if fresh and os.path.exists(self.partial_file):
+            os.remove(self.partial_file)
+        if not fresh and not os.path.exists(self.partial_file) and os.path.exists(self.output_file):
+            shutil.copyfile(self.output_file, self.partial_file)
+
+        self.done = set()
+        if os.path.exists(self.partial_file):
+            # 끊긴 행 뒤에 이어 쓰지 않도록 온전한 행만 남겨서 시작
+            rows = _read_rows(self.partial_file)
+            _write_rows(self.partial_file, rows)
+            self.done = {id_key(row['id']) for row in rows}
+            print(f"Resuming: {len(self.done)} posts already in {self.partial_file}")
+        self._sink = RecordSink(self.partial_file, fieldnames=OUTPUT_FIELDS, fmt="csv", append=True)
+
+    def is_done(self, talk_no):
+        return id_key(talk_no) in self.done
+
+    def write(self, rows):
+        for row in rows:
+            self._sink.write(row)
+            self.done.add(id_key(row['id']))
+        self._sink.flush()
+
+    def finalize(self, talk_nos):
+        # talk_nos: 입력 CSV 순서의 talkNo 목록 (입력에 없는 id 는 맨 뒤)
+        self._sink.close()
+        order = {id_key(talk_no): idx for idx, talk_no in enumerate(talk_nos)}
+        rows = sorted(_read_rows(self.partial_file), key=lambda row: order.get(id_key(row['id']), len(order)))
+        _write_rows(self.output_file, rows)
+        os.remove(self.partial_file)
+        return len(rows)
+
+    def close(self):
+        self._sink.close()
+
+
+def to_output_row(row, post):
+    # 입력 행(talkNo, ViewCount, Date)과 게시글 하나의 정제 결과로 출력 행 구성
+    return {
+        'id': row['talkNo'],
+        'content': post['content'],
+        'comments': '; '.join(post['comments']),
+        'keywords': '; '.join(post['keywords']),
+        'tendency': post['tendency'],
+        'views': row['ViewCount'],
+        'date': row['Date'],
+    }
@@ -0,0 +1,145 @@
+import argparse
+import ast
+import csv
+import os
+import http_client
+from crawling import fetch_talk_collection, TARGET_PAGE
+from combined_crawler import get_detail, BASE_URL, headers
+from record_sink import RecordSink, ProgressReporter
+
+'''
+조회수/댓글 수만 갱신하는 가벼운 새로고침
+1. 목록 API 를 넘기며 기존 CSV 에 있는 talkNo 의 viewCount, replyCount 수집
+   (가장 오래된 talkNo 보다 이전 페이지에 도달하면 중단)
+2. replyCount 가 바뀐 게시글만 상세 페이지를 다시 요청해 댓글 갱신
+3. 기존 CSV 의 ViewCount/ReplyCount/Comments 를 한 줄씩 갱신하고, 댓글이 바뀐 게시글만 따로 저장
+4. --refine 을 주면 바뀐 게시글만 GPT 정제 후 정제 결과 CSV 에 id 기준으로 반영 (views 는 전체 갱신)
+
+사용 예시:
+python refresh_metrics.py
+python refresh_metrics.py --refine refine_result/output3.csv
+'''
+
+INPUT_FILE = os.path.join("crawling_result", "crawling_combined_result.csv")
+CHANGED_FILE = os.path.join("crawling_result", "crawling_changed_posts.csv")
+
+
+def previous_reply_count(row):
+    # 예전 CSV 에는 ReplyCount 가 없으므로 저장된 댓글 개수로 대신함
+    if row.get("ReplyCount", "") not in ("", None):
+        return int(row["ReplyCount"])
+    try:
+        return len(ast.literal_eval(row.get("Comments") or "[]"))
+    except (ValueError, SyntaxError):
+        return 0
+
+
+def load_reply_counts(csv_file):
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        return {int(row["talkNo"]): previous_reply_count(row) for row in csv.DictReader(f)}
+
+
+def collect_metrics(known_talk_nos, max_pages=TARGET_PAGE):
+    oldest = min(known_talk_nos)
+    metrics = {}
+    for page in range(1, max_pages + 1):
+        items = fetch_talk_collection(page)
+        if not items:
+            break
+        for item in items:
+            if item["talkNo"] in known_talk_nos:
+                metrics[item["talkNo"]] = (item.get("viewCount", "N/A"), item.get("replyCount") or 0)
+        if min(item["talkNo"] for item in items) < oldest:
+            break
+    print(f"🔹 목록 {page}페이지에서 게시글 {len(metrics)}개의 조회수/댓글 수 확인")
+    return metrics
+
+
+def refetch_comments(talk_nos):
+    comments = {}
+    progress = ProgressReporter("댓글 다시 수집")
+    for talk_no in talk_nos:
+        detail = get_detail(BASE_URL, talk_no, headers)
+        if detail["title"]:
+            comments[talk_no] = [comment["comment_text"] for comment in detail["comments"]]
+        progress.tick(saved=bool(detail["title"]))
+    progress.done()
+    return comments
+
+
+def rewrite_csv(csv_file, metrics, comments, changed_file):
+    # 기존 CSV 를 한 줄씩 갱신하며 댓글이 바뀐 게시글은 changed_file 에도 기록
+    tmp_file = csv_file + ".tmp"
+    with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames)
+        if "ReplyCount" not in fieldnames:
+            fieldnames.insert(fieldnames.index("ViewCount") + 1, "ReplyCount")
+        with RecordSink(tmp_file, fieldnames=fieldnames, fmt="csv") as sink, \
+                RecordSink(changed_file, fieldnames=fieldnames, fmt="csv") as changed:
+            for row in reader:
+                talk_no = int(row["talkNo"])
+                if talk_no in metrics:
+                    view_count, reply_count = metrics[talk_no]
+                    row["ViewCount"] = view_count
+                    # 댓글을 다시 가져오지 못했으면 ReplyCount 를 그대로 두어 다음 새로고침에서 다시 바뀐 게시글로 잡힘
+                    if talk_no in comments or reply_count == previous_reply_count(row):
+                        row["ReplyCount"] = reply_count
+                if talk_no in comments:
+                    row["Comments"] = comments[talk_no]
+                    changed.write(row)
+                sink.write(row)
+    os.replace(tmp_file, csv_file)
+    return changed.count
+
+
+def _talk_no(value):
+    # 정제 결과의 id 는 "978572" 또는 "978572.0" 형태
+    return int(float(value)) if value not in ("", None) else None
+
+
+def refine_changed(changed_file, refined_file, metrics):
+    # 바뀐 게시글만 GPT 로 정제한 뒤 기존 정제 결과에 id 기준으로 덮어쓰기
+    from csv_post_processor_function_calling import process_csv
+
+    partial_file = refined_file + ".refresh"
+    process_csv(changed_file, partial_file, fresh=True)
+    with open(partial_file, 'r', encoding='utf-8-sig', newline='') as f:
+        refined = {_talk_no(row["id"]): row for row in csv.DictReader(f) if row.get("id")}
+
+    tmp_file = refined_file + ".tmp"
+    with open(refined_file, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        with RecordSink(tmp_file, fieldnames=reader.fieldnames, fmt="csv") as sink:
+            for row in reader:
+                talk_no = _talk_no(row.get("id"))
+                row = refined.pop(talk_no, row)
+                if talk_no in metrics:
+                    row["views"] = metrics[talk_no][0]
+                sink.write(row)
+            for row in refined.values():  # 정제 결과에 없던 게시글
+                sink.write(row)
+    os.replace(tmp_file, refined_file)
+    os.remove(partial_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="조회수/댓글 수 새로고침")
+    parser.add_argument("--input", default=INPUT_FILE, help="갱신할 상세 크롤링 CSV")
+    parser.add_argument("--max-pages", type=int, default=TARGET_PAGE)
+    parser.add_argument("--refine", metavar="REFINED_CSV", help="댓글이 바뀐 게시글만 GPT 정제 후 이 정제 결과 CSV 에 반영")
+    args = parser.parse_args()
+
+    reply_counts = load_reply_counts(args.input)
+    metrics = collect_metrics(set(reply_counts), args.max_pages)
+    changed_talk_nos = [talk_no for talk_no, (_, reply_count) in metrics.items() if reply_count != reply_counts[talk_no]]
+    print(f"🔹 댓글 수가 바뀐 게시글 {len(changed_talk_nos)}개")
+
+    comments = refetch_comments(changed_talk_nos)
+    http_client.close()
+    changed_count = rewrite_csv(args.input, metrics, comments, CHANGED_FILE)
+    print(f"Data saved to {args.input} (댓글 변경 {changed_count}건 → {CHANGED_FILE})")
+
+    if args.refine and changed_count:
+        refine_changed(CHANGED_FILE, args.refine, metrics)
+        print(f"Refined results merged into {args.refine}")
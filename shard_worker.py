@@ -0,0 +1,178 @@
+import argparse
+import glob
+import json
+import os
+import socket
+import time
+from multiprocessing import Process
+import httpx
+import http_client
+from crawling import find_talk_no_range, fetch_talk_collection, parse_talk_items, TARGET_PAGE, TALK_FIELDS
+from combined_crawler import get_detail, BASE_URL, POST_FIELDS, headers
+from detail_parser import to_post_row
+from record_sink import RecordSink, ProgressReporter
+from talk_index import TalkIndex, MISSING_STATUS
+from work_queue import WorkQueue, LEASE_SECONDS
+
+'''
+샤드 단위 분산 크롤링 워커
+- init : talkNo 범위(와 목록 페이지)를 샤드로 나눠 작업 큐에 등록
+- work : 큐에서 샤드를 빌려 크롤링 (--processes 로 한 호스트에서 여러 워커 실행, 다른 호스트에서도 같은 큐 사용 가능)
+- merge: 완료된 샤드 결과를 순서대로 합쳐 CSV 생성
+- status: 샤드 상태 집계
+- 재시도 뒤에도 실패한 목록 페이지/상세 페이지(429/5xx)가 있으면 샤드를 완료하지 않고 반납 (MAX_ATTEMPTS 에 포함)
+
+사용 예시:
+python shard_worker.py init --shard-size 2000 --pages
+python shard_worker.py work --processes 4
+python shard_worker.py merge
+'''
+
+SHARD_DIR = os.path.join("crawling_result", "shards")
+
+
+class ShardIncomplete(Exception):
+    # 샤드 안에 확인하지 못한 단위가 있어 done 으로 표시할 수 없음
+    pass
+
+
+def shard_file(shard):
+    return os.path.join(SHARD_DIR, f"{shard['kind']}_{shard['start']}_{shard['stop']}.jsonl")
+
+
+def crawl_shard(queue, shard, worker_id, index):
+    # 샤드 결과는 임시 파일에 쓰고, lease 를 유지한 채로 끝났을 때만 샤드 파일로 교체
+    out_file = shard_file(shard)
+    tmp_file = f"{out_file}.{worker_id}.tmp"
+    last_beat = time.monotonic()
+
+    if shard["kind"] == "talk":
+        units = range(shard["start"], shard["stop"], -1)
+    else:
+        units = range(shard["start"], shard["stop"] + 1)
+
+    finished = True
+    with RecordSink(tmp_file, fmt="jsonl") as sink:
+        for unit in units:
+            if time.monotonic() - last_beat > LEASE_SECONDS / 3:
+                if not queue.heartbeat(shard["id"], worker_id):
+                    print(f"⚠️ [{worker_id}] 샤드 {shard['id']} lease 를 잃어 중단합니다.")
+                    finished = False
+                    break
+                last_beat = time.monotonic()
+
+            if shard["kind"] == "page":
+                # 요청 실패는 빈 페이지와 구분되도록 예외로 올림 (raise_for_status)
+                for row in parse_talk_items({"collection": fetch_talk_collection(unit)}):
+                    sink.write(row)
+                continue
+
+            # 다른 워커와 인덱스 파일을 덮어쓰지 않도록 missing 은 읽기만 함
+            if index.is_missing(unit):
+                continue
+            detail = get_detail(BASE_URL, unit, headers)
+            if detail["title"]:
+                sink.write(to_post_row(unit, detail))
+            elif detail["status_code"] not in MISSING_STATUS:
+                raise ShardIncomplete(f"talkNo {unit} 상태 코드 {detail['status_code']}")
+
+    if finished and queue.heartbeat(shard["id"], worker_id):
+        os.replace(tmp_file, out_file)
+        queue.complete(shard["id"], worker_id)
+        return True
+    os.remove(tmp_file)
+    return False
+
+
+def run_worker(worker_id):
+    queue = WorkQueue()
+    index = TalkIndex()
+    progress = ProgressReporter(f"워커 {worker_id}")
+    os.makedirs(SHARD_DIR, exist_ok=True)
+
+    while True:
+        shard = queue.claim(worker_id)
+        if shard is None:
+            break
+        print(f"🚀 [{worker_id}] 샤드 {shard['id']} ({shard['kind']} {shard['start']}~{shard['stop']}) 시작")
+        try:
+            done = crawl_shard(queue, shard, worker_id, index)
+        except (httpx.HTTPError, OSError, ShardIncomplete) as e:
+            # 임시 파일은 다음 시도에서 새로 씀
+            print(f"❌ [{worker_id}] 샤드 {shard['id']} 실패: {e}")
+            if queue.release(shard["id"], worker_id):
+                print(f"❌ [{worker_id}] 샤드 {shard['id']} 가 {shard['attempts'] + 1}번 실패하여 더 이상 시도하지 않음 (status --retry-failed 로 다시 시도)")
+            continue
+        progress.tick(saved=done)
+
+    progress.done()
+    http_client.close()
+    queue.close()
+
+
+def merge(kind, csv_file, fieldnames):
+    # talk 샤드는 최신 talkNo 부터, page 샤드는 1페이지부터 이어 붙임
+    queue = WorkQueue()
+    shards = [{"kind": kind, "start": start, "stop": stop} for _, start, stop in queue.done_shards(kind)]
+    shards.sort(key=lambda shard: shard["start"], reverse=(kind == "talk"))
+    queue.close()
+
+    with RecordSink(csv_file, fieldnames=fieldnames, fmt="csv") as sink:
+        for shard in shards:
+            with open(shard_file(shard), 'r', encoding='utf-8') as f:
+                for line in f:
+                    sink.write(json.loads(line))
+    print(f"Data saved to {csv_file} (샤드 {len(shards)}개, {sink.count} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="샤드 단위 분산 크롤링")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init")
+    init_parser.add_argument("--last-page", type=int, default=TARGET_PAGE, help="0 이면 마지막 페이지 자동 탐색")
+    init_parser.add_argument("--shard-size", type=int, default=1000, help="샤드 하나의 talkNo 개수")
+    init_parser.add_argument("--pages", action="store_true", help="목록 API 페이지 샤드도 등록")
+    init_parser.add_argument("--page-shard-size", type=int, default=50)
+
+    work_parser = subparsers.add_parser("work")
+    work_parser.add_argument("--processes", type=int, default=1)
+    work_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+
+    subparsers.add_parser("merge")
+    status_parser = subparsers.add_parser("status")
+    status_parser.add_argument("--retry-failed", action="store_true", help="실패로 표시된 샤드를 다시 대기 상태로")
+    args = parser.parse_args()
+
+    if args.command == "init":
+        start_talk_no, last_talk_no = find_talk_no_range(args.last_page or None)
+        if start_talk_no is None:
+            raise SystemExit("❌ 목록 API 에서 talkNo 범위를 찾지 못했습니다.")
+        queue = WorkQueue()
+        count = queue.create_shards("talk", start_talk_no, last_talk_no - 1, args.shard_size)
+        print(f"🔹 talkNo {start_talk_no} ~ {last_talk_no}: 샤드 {count}개")
+        if args.pages:
+            count = queue.create_shards("page", 1, args.last_page or TARGET_PAGE, args.page_shard_size)
+            print(f"🔹 목록 페이지: 샤드 {count}개")
+        queue.close()
+    elif args.command == "work":
+        if args.processes == 1:
+            run_worker(args.worker_id)
+        else:
+            workers = [Process(target=run_worker, args=(f"{args.worker_id}-{n}",)) for n in range(args.processes)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+    elif args.command == "merge":
+        merge("talk", os.path.join("crawling_result", "crawling_combined_result.csv"), POST_FIELDS)
+        if glob.glob(os.path.join(SHARD_DIR, "page_*.jsonl")):
+            merge("page", os.path.join("crawling_result", "crawling_results_talkNo.csv"), TALK_FIELDS)
+    else:
+        queue = WorkQueue()
+        if args.retry_failed:
+            print(f"🔁 실패한 샤드 {queue.retry_failed()}개를 다시 대기 상태로 돌렸습니다.")
+        print(queue.stats())
+        for shard_id, kind, start, stop, attempts in queue.failed_shards():
+            print(f"❌ 실패한 샤드 {shard_id}: {kind} {start}~{stop} ({attempts}번 시도)")
+        queue.close()
@@ -0,0 +1,67 @@
+import json
+
+'''
+스트리밍 응답 조각에서 완성된 게시글 단위를 바로 꺼내는 파서
+- BlockStreamParser: 빈 줄("\n\n")로 구분된 텍스트 블록이 끝날 때마다 반환 (csv_post_processor)
+- JsonItemStreamParser: {"posts": [{...}, {...}]} 의 배열 안 객체가 닫힐 때마다 json.loads 해서 반환
+  (csv_post_processor_function_calling 의 function call arguments)
+'''
+
+
+class BlockStreamParser:
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text):
+        self._buffer += text
+        *blocks, self._buffer = self._buffer.split("\n\n")
+        return [block for block in blocks if block.strip()]
+
+    def close(self):
+        # 응답이 끝나면 남은 마지막 블록
+        rest, self._buffer = self._buffer, ""
+        return [rest] if rest.strip() else []
+
+
+class JsonItemStreamParser:
+    def __init__(self, depth=2):
+        self.depth = depth  # 꺼낼 객체가 시작되는 중첩 깊이 (최상위 객체 → 배열 → 객체 = 2)
+        self._level = 0
+        self._in_string = False
+        self._escape = False
+        self._item = None  # 지금 읽고 있는 객체의 문자들
+
+    def feed(self, text):
+        items = []
+        for ch in text:
+            if self._item is not None:
+                self._item.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._level == self.depth and self._item is None:
+                    self._item = [ch]
+                self._level += 1
+            elif ch in "}]":
+                self._level -= 1
+                if ch == "}" and self._level == self.depth and self._item is not None:
+                    try:
+                        items.append(json.loads("".join(self._item)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item = None
+        return items
+
+    def close(self):
+        # 닫히지 않은(잘린) 객체는 버림
+        self._item = None
+        return []
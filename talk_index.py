@@ -0,0 +1,131 @@
+import json
+import os
+import time
+import httpx
+from crawling import fetch_talk_collection
+
+'''
+talkNo 음성 캐시 / 빈 구간 인덱스
+- missing: 상세 페이지에 제목이 없던(삭제됨, 다른 talkType) talkNo → 다음 스캔부터 요청하지 않음
+- enumerate_valid(): 목록 API(EXPERIENCE)로 범위 안의 유효한 talkNo 를 한꺼번에 모으고,
+  범위 안에서 목록에 없는 talkNo(빈 구간)를 상세 요청 전에 gaps 로 표시
+  · 목록을 범위 끝(stop)까지 다 넘긴 경우에만 기록 (중간 페이지 요청이 실패하면 빈 구간을 알 수 없음)
+  · 목록 요청이 실패해도 예외를 올리지 않고 그때까지 모은 유효한 talkNo 만 저장 (상세 크롤링은 빈 구간 없이 진행)
+  · 페이지를 넘기는 동안 글이 삭제되면 목록이 밀려 빠지는 talkNo 가 있으므로,
+    gaps 는 상세 페이지로 확인한 missing 과 따로 두고 GAP_TTL 이 지나면 다시 요청
+- JSON 파일에 [시작, 끝] 구간 목록으로 압축해서 저장 (gaps 는 [시작, 끝, 확인 시각])
+'''
+
+INDEX_FILE = os.path.join("crawling_result", "talk_index.json")
+SAVE_EVERY = 500  # missing 이 n개 추가될 때마다 저장
+GAP_TTL = 24 * 3600  # 목록에 없던 talkNo 를 요청하지 않는 기간(초)
+MISSING_STATUS = {200, 404}  # 이 상태 코드에서 제목이 없을 때만 missing 으로 판단 (5xx 는 일시적 오류)
+
+
+def _to_ranges(talk_nos):
+    ranges = []
+    for talk_no in sorted(talk_nos):
+        if ranges and ranges[-1][1] == talk_no - 1:
+            ranges[-1][1] = talk_no
+        else:
+            ranges.append([talk_no, talk_no])
+    return ranges
+
+
+def _to_timed_ranges(times):
+    # {talkNo: 확인 시각} → 연속이고 확인 시각이 같은 talkNo 끼리 [시작, 끝, 확인 시각]
+    ranges = []
+    for talk_no in sorted(times):
+        if ranges and ranges[-1][1] == talk_no - 1 and ranges[-1][2] == times[talk_no]:
+            ranges[-1][1] = talk_no
+        else:
+            ranges.append([talk_no, talk_no, times[talk_no]])
+    return ranges
+
+
+def _from_ranges(ranges):
+    talk_nos = set()
+    for start, end in ranges:
+        talk_nos.update(range(start, end + 1))
+    return talk_nos
+
+
+class TalkIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.missing = set()
+        self.valid = set()
+        self.gaps = {}  # 목록에 없던 talkNo → 확인 시각
+        self._unsaved = 0
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.missing = _from_ranges(data.get("missing", []))
+            self.valid = _from_ranges(data.get("valid", []))
+            expires = time.time() - GAP_TTL
+            for start, end, checked_at in data.get("gaps", []):
+                if checked_at > expires:
+                    self.gaps.update(dict.fromkeys(range(start, end + 1), checked_at))
+            print(f"🗂️ talkNo 인덱스: missing {len(self.missing)}개, 빈 구간 {len(self.gaps)}개, valid {len(self.valid)}개")
+
+    def is_missing(self, talk_no):
+        if talk_no in self.missing:
+            return True
+        checked_at = self.gaps.get(talk_no)
+        return checked_at is not None and time.time() - checked_at < GAP_TTL
+
+    def mark_missing(self, talk_no, status_code=200):
+        if status_code not in MISSING_STATUS or talk_no in self.valid:
+            return
+        self.missing.add(talk_no)
+        self.gaps.pop(talk_no, None)
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def enumerate_valid(self, start_talk_no, stop_talk_no):
+        # 최신순 목록을 넘기며 (stop, start] 범위의 유효한 talkNo 수집 후 나머지를 gaps 로 표시
+        page = 1
+        found = set()
+        reached = False
+        while True:
+            try:
+                items = fetch_talk_collection(page)
+            except httpx.HTTPError as e:
+                print(f"❌ 목록 {page}페이지 요청 실패: {e}")
+                break
+            if not items:
+                break
+            found.update(item["talkNo"] for item in items if stop_talk_no < item["talkNo"] <= start_talk_no)
+            if min(item["talkNo"] for item in items) <= stop_talk_no:
+                reached = True
+                break
+            page += 1
+
+        self.valid |= found
+        self.missing -= found
+        for talk_no in found:
+            self.gaps.pop(talk_no, None)
+        if not reached:
+            # 빈 페이지가 실패/제한 때문일 수 있으므로 목록에 없던 talkNo 를 빈 구간으로 단정하지 않음
+            self.save()
+            print(f"⚠️ 목록 {page}페이지에서 범위 끝({stop_talk_no})까지 가지 못해 빈 구간은 기록하지 않음 (유효한 talkNo {len(found)}개)")
+            return found
+
+        checked_at = int(time.time())
+        gaps = set(range(stop_talk_no + 1, start_talk_no + 1)) - found - self.missing
+        self.gaps.update(dict.fromkeys(gaps, checked_at))
+        self.save()
+        print(f"🗂️ 목록 API 로 유효한 talkNo {len(found)}개 확인, 빈 구간 {len(gaps)}개는 {GAP_TTL // 3600}시간 동안 요청하지 않음 (목록 {page}페이지)")
+        return found
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_file = self.path + ".tmp"
+        expires = time.time() - GAP_TTL
+        self.gaps = {talk_no: checked_at for talk_no, checked_at in self.gaps.items() if checked_at > expires}
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"missing": _to_ranges(self.missing), "valid": _to_ranges(self.valid),
+                       "gaps": _to_timed_ranges(self.gaps)}, f)
+        os.replace(tmp_file, self.path)
+        self._unsaved = 0
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# gpt_client 는 import 할 때 Azure 클라이언트를 만들므로 가짜 설정을 먼저 넣어둠 (실제 요청은 보내지 않음)
+os.environ.setdefault("ENDPOINT_URL", "https://example.openai.azure.com")
+os.environ.setdefault("AZURE_OPENAI_API_KEY", "test-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
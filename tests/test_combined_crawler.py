@@ -0,0 +1,42 @@
+import combined_crawler
+
+
+class Journal:
+    def __init__(self):
+        self.records = []
+
+    def is_done(self, talk_no):
+        return False
+
+    def record(self, talk_no, row=None):
+        self.records.append((talk_no, row))
+
+
+class Index:
+    def __init__(self):
+        self.missing = []
+
+    def is_missing(self, talk_no):
+        return False
+
+    def mark_missing(self, talk_no, status_code=200):
+        self.missing.append(talk_no)
+
+
+class Progress:
+    def tick(self, saved=True):
+        pass
+
+
+def test_crawl_post_detail_counts_unsettled_talk_nos(monkeypatch):
+    statuses = {103: 200, 102: 404, 101: 503}
+    monkeypatch.setattr(combined_crawler, "get_detail", lambda url, talk_no, headers: {
+        "title": "제목" if talk_no == 103 else None, "contents": "내용", "date": "N/A", "view_count": "1",
+        "comments": [], "status_code": statuses[talk_no]})
+    journal, index = Journal(), Index()
+
+    failed = combined_crawler.crawl_post_detail(103, 100, journal, Progress(), index)
+
+    assert failed == 1  # 503 은 저널에 기록하지 않고 high-water mark 도 올리지 않음
+    assert [talk_no for talk_no, _ in journal.records] == [103, 102]
+    assert index.missing == [102]
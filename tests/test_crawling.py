@@ -0,0 +1,36 @@
+import crawling
+
+
+class Sink:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+
+class Progress:
+    def tick(self, saved=True):
+        pass
+
+
+def listing(pages):
+    return lambda page: [{"talkNo": talk_no} for talk_no in pages.get(page, [])]
+
+
+def test_incremental_reaches_high_water_mark(monkeypatch):
+    monkeypatch.setattr(crawling, "get_talkNo_api", listing({1: [110, 109], 2: [108, 100, 99]}))
+    sink = Sink()
+    assert crawling.crawl_api_incremental(sink, Progress(), 100) == (110, True)
+    assert [row["talkNo"] for row in sink.rows] == [110, 109, 108]
+
+
+def test_incremental_failed_page_is_incomplete(monkeypatch):
+    # 2페이지 요청 실패 → 1페이지의 talkNo 를 high-water mark 로 쓰면 101~108 을 영영 놓침
+    monkeypatch.setattr(crawling, "get_talkNo_api", listing({1: [110, 109], 3: [100]}))
+    assert crawling.crawl_api_incremental(Sink(), Progress(), 100) == (110, False)
+
+
+def test_incremental_max_pages_is_incomplete(monkeypatch):
+    monkeypatch.setattr(crawling, "get_talkNo_api", listing({1: [110], 2: [109], 3: [100]}))
+    assert crawling.crawl_api_incremental(Sink(), Progress(), 100, max_pages=2) == (110, False)
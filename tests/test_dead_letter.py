@@ -0,0 +1,53 @@
+import json
+
+import csv_post_processor_function_calling as processor
+import refine_batches
+
+POSTS = [
+    (978572, "카페 알바 구하기", "지원해도 연락이 없어요", "['저도요']"),
+    (978571, "면접 후기", "면접 보고 왔어요", "[]"),
+    (978570, "급여 질문", "주휴수당 받을 수 있나요?", "['네 받을 수 있어요']"),
+]
+BAD_TALK_NO = 978571
+
+
+def write_input(path):
+    lines = ["talkNo,Title,Contents,Comments,ViewCount,Date"]
+    for talk_no, title, contents, comments in POSTS:
+        lines.append(f'{talk_no},{title},{contents},"{comments}",10,2025-02-02 00:23')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def fake_gpt(prompt):
+    # BAD_TALK_NO 게시글만 응답에서 빠뜨림
+    posts = []
+    for line in prompt.splitlines():
+        talk_no = int(line.split("talkNo: ")[1].split(",")[0])
+        if talk_no != BAD_TALK_NO:
+            posts.append({"talkNo": talk_no, "content": "요약", "comments": ["없음"],
+                          "keywords": ["알바"], "tendency": "경험성"})
+    return json.dumps({"posts": posts}, ensure_ascii=False)
+
+
+async def fake_request(fmt, prompt):
+    return fake_gpt(prompt)
+
+
+def test_missing_post_is_dead_lettered(tmp_path, monkeypatch):
+    input_file = tmp_path / "input.csv"
+    output_file = tmp_path / "output.csv"
+    write_input(input_file)
+    monkeypatch.setattr(refine_batches, "request_text", fake_request)
+    monkeypatch.setattr(refine_batches, "BATCH_PAUSE", 0)
+    # tiktoken 인코딩을 내려받지 않도록 글자 수로 셈
+    monkeypatch.setattr(refine_batches, "count_tokens", lambda text, model: len(text))
+
+    processor.process_csv(str(input_file), str(output_file), use_cache=False)
+
+    dead_letters = [json.loads(line) for line in open(str(output_file) + ".dead_letter.jsonl", encoding="utf-8")]
+    assert [record["talkNo"] for record in dead_letters] == [BAD_TALK_NO]
+    assert dead_letters[0]["row"] == 2
+
+    saved = output_file.read_text(encoding="utf-8-sig").splitlines()
+    assert [line.split(",")[0] for line in saved[1:]] == ["978572", "978570"]
+    assert not (tmp_path / "output.csv.partial").exists()
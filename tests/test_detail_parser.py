@@ -0,0 +1,28 @@
+from detail_parser import parse_detail
+
+# 실제 페이지처럼 여러 클래스를 가진 태그 (class="a b")
+MULTI_CLASS_HTML = (
+    '<html><body><script>var x = 1;</script>'
+    '<h1 class="DetailTitle_detail__header--title__Bbp40 Typography_typography__h1">제목</h1>'
+    '<div class="CommonInfos_info__wrapper__aGcEl Flex_flex__row"><div>익명</div><div>2025-01-01</div></div>'
+    '<span class="experience__span experience__span--view">42</span>'
+    '<div class="Detail_content__content__hJ5M7 x">내용</div>'
+    '<div class="CommentList_comment-contents__YVrtF y"><ul>'
+    '<li><p class="comment-list__text-override">댓글</p><p class="comment-list__detail-override">2025-01-02</p></li>'
+    '</ul></div></body></html>'
+)
+
+
+def test_fast_matches_full_with_multiple_classes():
+    fast = parse_detail(MULTI_CLASS_HTML)
+    assert fast == parse_detail(MULTI_CLASS_HTML, engine="full")
+    assert fast["title"] == "제목"
+    assert fast["date"] == "2025-01-01"
+    assert fast["view_count"] == "42"
+    assert fast["comments"] == [{"comment_date": "2025-01-02", "comment_text": "댓글"}]
+
+
+def test_strainer_skips_other_elements():
+    html = '<div class="other">제목</div><h1 class="DetailTitle_detail__header--title__Bbp40">T</h1>'
+    assert parse_detail(html)["title"] == "T"
+    assert parse_detail(html, engine="strainer") == parse_detail(html, engine="full")
@@ -0,0 +1,19 @@
+import gpt_client
+
+
+def test_embedding_resource_uses_its_own_endpoint_and_api_version(monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://embedding.openai.azure.com")
+    monkeypatch.setenv("OPENAI_API_VERSION", "2024-06-01")
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_QUOTA", "text-embedding-3-large=350000/2100")
+
+    configs = gpt_client.load_embedding_deployments()
+    assert [config["endpoint"] for config in configs] == ["https://embedding.openai.azure.com"]
+    assert configs[0]["quota"] == {"text-embedding-3-large": (350000, 2100)}
+
+    pool = gpt_client.DeploymentPool(configs)
+    assert pool.deployments[0].client._api_version == "2024-06-01"
+
+
+def test_no_embedding_resource_falls_back_to_default_pool(monkeypatch):
+    monkeypatch.delenv("AZURE_OPENAI_ENDPOINT", raising=False)
+    assert gpt_client.load_embedding_deployments() is None
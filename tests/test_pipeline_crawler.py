@@ -0,0 +1,59 @@
+import asyncio
+
+import pipeline_crawler
+
+
+class Journal:
+    def __init__(self):
+        self.records = []
+
+    def record(self, talk_no, row=None):
+        self.records.append((talk_no, row))
+
+
+class Index:
+    def __init__(self):
+        self.missing = []
+
+    def mark_missing(self, talk_no, status_code=200):
+        self.missing.append(talk_no)
+
+
+class Progress:
+    def tick(self, saved=True):
+        pass
+
+
+def test_write_journals_only_settled_results():
+    async def run():
+        journal, index = Journal(), Index()
+        window = asyncio.Semaphore(0)
+        queue = asyncio.Queue()
+        # 도착 순서와 관계없이 seq 순서대로 기록
+        for item in [(1, 109, 404, None), (0, 110, 200, {"talkNo": 110}), (3, 107, None, None),
+                     (2, 108, 503, None), (4, 106, 200, None), None]:
+            queue.put_nowait(item)
+        failed = await pipeline_crawler._write(queue, journal, Progress(), index, window)
+        return journal, index, window, failed
+
+    journal, index, window, failed = asyncio.run(run())
+    assert failed == 2  # 연결 오류(107)와 503(108)은 다시 요청해야 함
+    assert journal.records == [(110, {"talkNo": 110}), (109, None), (106, None)]
+    assert index.missing == [109, 106]
+    assert window._value == 5  # 기록했든 안 했든 순서가 지나간 seq 마다 자리를 돌려줌
+
+
+def test_producer_waits_for_writer_window():
+    async def run():
+        window = asyncio.Semaphore(2)
+        id_queue = asyncio.Queue()
+        producer = asyncio.create_task(pipeline_crawler._produce(range(100, 95, -1), id_queue, 1, window))
+        await asyncio.sleep(0.01)
+        sent_before = id_queue.qsize()
+        window.release()
+        await asyncio.sleep(0.01)
+        sent_after = id_queue.qsize()
+        producer.cancel()
+        return sent_before, sent_after
+
+    assert asyncio.run(run()) == (2, 3)
@@ -0,0 +1,109 @@
+import asyncio
+
+import httpx
+import openai
+import pandas as pd
+import pytest
+
+import csv_post_processor_function_calling as processor
+import refine_batches
+from test_dead_letter import fake_gpt
+
+BAD_TALK_NO = 103
+
+
+def make_error(cls, status_code, body=None):
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://example.openai.azure.com"))
+    return cls("error", response=response, body=body)
+
+
+class DeadLetter:
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def df_input():
+    return pd.DataFrame({
+        "talkNo": [100 + j for j in range(8)],
+        "Title": ["제목"] * 8,
+        "Contents": ["내용"] * 8,
+        "Comments": ["[]"] * 8,
+    })
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(refine_batches, "RETRY_BACKOFF", 0)
+
+
+def process_batch(df_input, rows, dead_letter, commit):
+    return asyncio.run(refine_batches.process_batch(processor, df_input, rows, dead_letter, commit))
+
+
+def test_auth_error_is_raised_without_bisecting(df_input, monkeypatch):
+    calls = []
+
+    async def gpt(fmt, prompt):
+        calls.append(prompt)
+        raise make_error(openai.AuthenticationError, 401)
+
+    monkeypatch.setattr(refine_batches, "request_text", gpt)
+    dead_letter = DeadLetter()
+    with pytest.raises(openai.AuthenticationError):
+        process_batch(df_input, list(range(8)), dead_letter, lambda posts: None)
+    assert len(calls) == 1
+    assert dead_letter.records == []
+
+
+def test_transient_error_retries_whole_batch_then_raises(df_input, monkeypatch):
+    calls = []
+
+    async def gpt(fmt, prompt):
+        calls.append(prompt.count("talkNo:"))
+        raise make_error(openai.InternalServerError, 503)
+
+    monkeypatch.setattr(refine_batches, "request_text", gpt)
+    with pytest.raises(openai.InternalServerError):
+        process_batch(df_input, list(range(8)), DeadLetter(), lambda posts: None)
+    assert calls == [8] * refine_batches.MAX_ATTEMPTS
+
+
+def test_content_filter_bisects_to_offending_post(df_input, monkeypatch):
+    async def gpt(fmt, prompt):
+        if f"talkNo: {BAD_TALK_NO}," in prompt:
+            raise make_error(openai.BadRequestError, 400, {"code": "content_filter"})
+        return fake_gpt(prompt)
+
+    monkeypatch.setattr(refine_batches, "request_text", gpt)
+    dead_letter = DeadLetter()
+    committed = {}
+    posts = process_batch(df_input, list(range(8)), dead_letter, committed.update)
+    assert sorted(posts) == [0, 1, 2, 4, 5, 6, 7]
+    assert sorted(committed) == sorted(posts)
+    assert [record["talkNo"] for record in dead_letter.records] == [BAD_TALK_NO]
+
+
+def test_stream_drop_retries_only_missing_posts(df_input, monkeypatch):
+    import csv_post_processor as text_processor
+
+    calls = []
+
+    async def stream(fmt, prompt):
+        numbers = [int(line.split(".")[0]) for line in prompt.splitlines()]
+        calls.append(numbers)
+        for n, number in enumerate(numbers):
+            if len(calls) == 1 and n == 3:
+                raise httpx.RemoteProtocolError("connection dropped")
+            yield f"{number}. 요약\n댓글: 없음\n키워드:\n- 알바\n성향: 경험성\n\n"
+
+    monkeypatch.setattr(refine_batches, "stream_text", stream)
+    committed = []
+    posts = asyncio.run(refine_batches.process_batch(text_processor, df_input, list(range(8)), DeadLetter(),
+                                                     lambda new: committed.extend(sorted(new)), stream=True))
+    # 끊기기 전에 완성된 3개는 바로 저장, 다시 요청할 때는 나머지만
+    assert calls == [list(range(1, 9)), list(range(4, 9))]
+    assert sorted(posts) == committed == list(range(8))
@@ -0,0 +1,40 @@
+from quota_scheduler import QuotaScheduler
+
+
+def test_tpm_wait_until_oldest_requests_leave_window():
+    scheduler = QuotaScheduler(tpm=100, window=60)
+    assert scheduler.wait_time(50, now=0) == 0
+    scheduler.reserve(50, now=0)
+    scheduler.reserve(30, now=10)
+
+    assert scheduler.wait_time(20, now=20) == 0
+    # 80 + 30 > 100 이므로 0초에 보낸 50 토큰이 창에서 빠질 때까지
+    assert scheduler.wait_time(30, now=20) == 40
+    assert scheduler.wait_time(30, now=60) == 0
+
+
+def test_rpm_wait():
+    scheduler = QuotaScheduler(rpm=2, window=60)
+    scheduler.reserve(1, now=0)
+    scheduler.reserve(1, now=30)
+
+    assert scheduler.wait_time(1, now=40) == 20
+    assert scheduler.wait_time(1, now=60) == 0
+
+
+def test_request_larger_than_tpm_waits_for_empty_window():
+    scheduler = QuotaScheduler(tpm=100, window=60)
+    # 창이 비어 있으면 한도보다 큰 요청도 바로 보냄 (영원히 막히지 않도록)
+    assert scheduler.wait_time(150, now=0) == 0
+    scheduler.reserve(50, now=0)
+    scheduler.reserve(20, now=10)
+
+    assert scheduler.wait_time(150, now=20) == 50
+    assert scheduler.wait_time(150, now=70) == 0
+
+
+def test_pause_blocks_regardless_of_limits():
+    scheduler = QuotaScheduler()
+    assert scheduler.wait_time(1) == 0
+    scheduler.pause(30)
+    assert 29 < scheduler.wait_time(1) <= 30
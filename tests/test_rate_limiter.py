@@ -0,0 +1,68 @@
+import rate_limiter
+from rate_limiter import AdaptiveRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_limiter(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    return AdaptiveRateLimiter(**kwargs), clock
+
+
+def test_throttled_response_halves_rate_once_per_interval(monkeypatch):
+    limiter, clock = make_limiter(monkeypatch, rate=4.0, min_rate=0.5, adjust_interval=1.0)
+
+    limiter.record(status_code=429)
+    assert limiter.rate == 2.0
+    # 동시에 실패한 요청들로 연속해서 줄이지 않음
+    limiter.record(status_code=503)
+    limiter.record(error=True)
+    assert limiter.rate == 2.0
+
+    clock.now = 1.0
+    limiter.record(status_code=500)
+    assert limiter.rate == 1.0
+    for step in range(2, 6):
+        clock.now = float(step)
+        limiter.record(status_code=429)
+    assert limiter.rate == 0.5  # min_rate 아래로 내려가지 않음
+
+
+def test_success_increases_rate_additively_up_to_max(monkeypatch):
+    limiter, clock = make_limiter(monkeypatch, rate=1.0, max_rate=2.0, additive_step=0.5, adjust_interval=1.0)
+
+    clock.now = 0.5
+    limiter.record(status_code=200)
+    assert limiter.rate == 1.0  # adjust_interval 이 지나기 전에는 그대로
+
+    for step in range(1, 5):
+        clock.now = float(step)
+        limiter.record(status_code=200)
+    assert limiter.rate == 2.0
+
+
+def test_slow_response_decreases_rate(monkeypatch):
+    limiter, clock = make_limiter(monkeypatch, rate=4.0, latency_factor=2.0, adjust_interval=1.0)
+
+    limiter.record(status_code=200, latency=0.1)
+    clock.now = 1.0
+    limiter.record(status_code=200, latency=0.5)
+    assert limiter.rate == 2.0
+
+
+def test_effective_rate_counts_requests_in_window(monkeypatch):
+    limiter, clock = make_limiter(monkeypatch, rate=100.0, window=10.0)
+
+    for _ in range(5):
+        limiter._reserve()
+    clock.now = 5.0
+    assert limiter.effective_rate() == 0.5
+    clock.now = 20.0
+    assert limiter.effective_rate() == 0.0
@@ -0,0 +1,25 @@
+import csv
+
+import refresh_metrics
+
+
+def test_reply_count_kept_when_comment_refetch_failed(tmp_path):
+    csv_file = tmp_path / "posts.csv"
+    csv_file.write_text(
+        "talkNo,Title,Contents,Date,ViewCount,Comments\n"
+        "3,a,b,2025-02-02,1,\"['x']\"\n"
+        "2,a,b,2025-02-02,1,\"['x']\"\n"
+        "1,a,b,2025-02-02,1,\"['x']\"\n", encoding="utf-8")
+    # 3: 댓글 다시 수집 성공, 2: 댓글 수가 바뀌었지만 다시 수집 실패, 1: 댓글 수 그대로
+    metrics = {3: (10, 2), 2: (20, 5), 1: (30, 1)}
+    comments = {3: ["x", "y"]}
+
+    changed = refresh_metrics.rewrite_csv(str(csv_file), metrics, comments, str(tmp_path / "changed.csv"))
+
+    with open(csv_file, encoding="utf-8-sig", newline="") as f:
+        rows = {int(row["talkNo"]): row for row in csv.DictReader(f)}
+    assert changed == 1
+    assert [rows[talk_no]["ViewCount"] for talk_no in (3, 2, 1)] == ["10", "20", "30"]
+    assert [rows[talk_no]["ReplyCount"] for talk_no in (3, 2, 1)] == ["2", "", "1"]
+    # 다음 새로고침에서 2 는 여전히 댓글 수가 바뀐 게시글
+    assert refresh_metrics.load_reply_counts(str(csv_file)) == {3: 2, 2: 1, 1: 1}
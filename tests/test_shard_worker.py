@@ -0,0 +1,31 @@
+import pytest
+
+import shard_worker
+from work_queue import WorkQueue
+
+
+class Index:
+    def is_missing(self, talk_no):
+        return False
+
+
+def detail(title, status_code):
+    return {"title": title, "contents": "내용", "date": "N/A", "view_count": "1", "comments": [], "status_code": status_code}
+
+
+def test_shard_with_failed_detail_is_not_completed(tmp_path, monkeypatch):
+    monkeypatch.setattr(shard_worker, "SHARD_DIR", str(tmp_path))
+    statuses = {103: detail("제목", 200), 102: detail(None, 404), 101: detail(None, 503)}
+    monkeypatch.setattr(shard_worker, "get_detail", lambda url, talk_no, headers: statuses[talk_no])
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.create_shards("talk", 103, 100, 10)
+    shard = queue.claim("w1")
+
+    with pytest.raises(shard_worker.ShardIncomplete):
+        shard_worker.crawl_shard(queue, shard, "w1", Index())
+    assert queue.stats() == {"leased": 1}
+
+    # 다시 시도해서 모두 확인되면 완료 (404 는 없는 글)
+    statuses[101] = detail("제목", 200)
+    assert shard_worker.crawl_shard(queue, shard, "w1", Index())
+    assert queue.stats() == {"done": 1}
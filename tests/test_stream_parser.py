@@ -0,0 +1,43 @@
+import json
+
+from stream_parser import BlockStreamParser, JsonItemStreamParser
+
+POSTS = [
+    {"talkNo": 1, "content": "그는 \"안녕 {}\" 이라고 했다", "comments": ["a]b", "c\\d"]},
+    {"talkNo": 2, "content": "} ] {", "comments": []},
+]
+TEXT = json.dumps({"posts": POSTS}, ensure_ascii=False)
+
+
+def feed_in_chunks(parser, text, size):
+    items = []
+    for start in range(0, len(text), size):
+        items += parser.feed(text[start:start + size])
+    return items + parser.close()
+
+
+def test_json_items_split_across_chunks():
+    # 한 글자씩 보내면 이스케이프(\)와 따옴표가 서로 다른 조각에 걸침
+    for size in (1, 2, 3, 7, len(TEXT)):
+        assert feed_in_chunks(JsonItemStreamParser(), TEXT, size) == POSTS
+
+
+def test_json_item_returned_as_soon_as_it_closes():
+    parser = JsonItemStreamParser()
+    first_end = TEXT.index("}, {") + 1
+    assert parser.feed(TEXT[:first_end - 1]) == []
+    assert parser.feed(TEXT[first_end - 1:first_end]) == [POSTS[0]]
+
+
+def test_truncated_json_item_is_dropped():
+    parser = JsonItemStreamParser()
+    truncated = TEXT[:TEXT.rindex('"comments"')]
+    assert parser.feed(truncated) == [POSTS[0]]
+    assert parser.close() == []
+
+
+def test_blocks_split_on_blank_lines():
+    parser = BlockStreamParser()
+    assert parser.feed("1. 첫 번째\n") == []
+    assert parser.feed("\n2. 두 번째") == ["1. 첫 번째"]
+    assert parser.close() == ["2. 두 번째"]
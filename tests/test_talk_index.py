@@ -0,0 +1,58 @@
+import json
+import time
+
+import httpx
+
+import talk_index
+from talk_index import TalkIndex
+
+
+def listing(pages):
+    # 1페이지부터 차례로 돌려줄 talkNo 목록, 없는 페이지는 빈 목록 (요청 실패와 같음)
+    return lambda page: [{"talkNo": talk_no} for talk_no in pages.get(page, [])]
+
+
+def test_gaps_not_recorded_when_paging_stops_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(talk_index, "fetch_talk_collection", listing({1: [110, 108, 107]}))
+    index = TalkIndex(str(tmp_path / "index.json"))
+
+    assert index.enumerate_valid(110, 100) == {110, 108, 107}
+    assert not any(index.is_missing(talk_no) for talk_no in range(101, 111))
+
+
+def test_gaps_recorded_when_paging_reaches_stop(tmp_path, monkeypatch):
+    monkeypatch.setattr(talk_index, "fetch_talk_collection", listing({1: [110, 108], 2: [105, 99]}))
+    path = str(tmp_path / "index.json")
+    index = TalkIndex(path)
+    index.enumerate_valid(110, 100)
+
+    reloaded = TalkIndex(path)
+    assert [talk_no for talk_no in range(101, 111) if reloaded.is_missing(talk_no)] == [101, 102, 103, 104, 106, 107, 109]
+    assert reloaded.missing == set()
+
+
+def test_gaps_expire(tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    old = time.time() - talk_index.GAP_TTL - 1
+    path.write_text(json.dumps({"missing": [[1, 1]], "valid": [], "gaps": [[5, 6, old], [8, 8, time.time()]]}))
+    index = TalkIndex(str(path))
+
+    assert index.is_missing(1)
+    assert not index.is_missing(5)
+    assert index.is_missing(8)
+
+
+def test_listing_error_keeps_found_talk_nos_without_gaps(tmp_path, monkeypatch):
+    def fetch(page):
+        if page == 2:
+            raise httpx.HTTPStatusError("503", request=httpx.Request("GET", "https://example.com"),
+                                        response=httpx.Response(503))
+        return [{"talkNo": 110}, {"talkNo": 108}]
+
+    monkeypatch.setattr(talk_index, "fetch_talk_collection", fetch)
+    path = str(tmp_path / "index.json")
+    TalkIndex(path).enumerate_valid(110, 100)
+
+    reloaded = TalkIndex(path)
+    assert reloaded.valid == {110, 108}
+    assert not any(reloaded.is_missing(talk_no) for talk_no in range(101, 111))
@@ -0,0 +1,19 @@
+from token_budget import estimate_output_tokens, pack_batches
+
+
+def test_pack_batches_splits_on_input_budget():
+    assert pack_batches([400, 400, 400], 1000, 100000) == [(0, 2), (2, 3)]
+
+
+def test_pack_batches_splits_on_output_budget():
+    per_post = estimate_output_tokens(100)
+    assert pack_batches([100] * 5, 100000, per_post * 2) == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_pack_batches_respects_max_posts():
+    assert pack_batches([10] * 5, 100000, 100000, max_posts=2) == [(0, 2), (2, 4), (4, 5)]
+
+
+def test_oversized_post_gets_its_own_batch():
+    assert pack_batches([10, 5000, 10], 1000, 100000) == [(0, 1), (1, 2), (2, 3)]
+    assert pack_batches([], 1000, 1000) == []
@@ -0,0 +1,41 @@
+import work_queue
+from work_queue import WorkQueue
+
+
+def test_shard_failing_repeatedly_is_marked_failed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.create_shards("talk", 100, 80, 10)
+
+    claimed = []
+    for _ in range(work_queue.MAX_ATTEMPTS):
+        shard = queue.claim("w1")
+        claimed.append(shard["start"])
+        if shard["start"] == 100:
+            failed = queue.release(shard["id"], "w1")
+        else:
+            queue.complete(shard["id"], "w1")
+    # 실패한 샤드를 다시 주기 전에 시도가 적은 샤드부터 나눠줌
+    assert claimed[:3] == [100, 90, 100]
+
+    while True:
+        shard = queue.claim("w1")
+        if shard is None:
+            break
+        failed = queue.release(shard["id"], "w1")
+    assert failed
+    assert queue.stats() == {"done": 1, "failed": 1}
+    assert [row[1:] for row in queue.failed_shards()] == [("talk", 100, 90, work_queue.MAX_ATTEMPTS)]
+
+    assert queue.retry_failed() == 1
+    assert queue.claim("w1")["start"] == 100
+    queue.close()
+
+
+def test_expired_lease_counts_as_attempt(tmp_path, monkeypatch):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.create_shards("page", 1, 10, 10)
+    for _ in range(work_queue.MAX_ATTEMPTS):
+        assert queue.claim("w1", lease_seconds=-1) is not None  # 워커가 죽어서 lease 만료
+    assert queue.claim("w1") is None
+    assert queue.stats() == {"failed": 1}
+    queue.close()
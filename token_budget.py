@@ -0,0 +1,73 @@
+'''
+GPT 요청 토큰 추정과 배치 구성
+- tiktoken 이 있으면 모델 인코딩으로 세고, 없으면 글자 수로 보수적으로 추정 (한글은 대략 글자당 1토큰 이하)
+- pack_batches(): 게시글별 입력 토큰과 예상 출력 토큰을 더해가며
+  요청 하나의 입력/출력 예산을 넘기 직전까지 연속된 게시글을 한 배치로 묶음
+- estimate_request_tokens(): 요청 하나가 분당 토큰 한도에서 차감될 양 (quota_scheduler 용)
+'''
+
+import json
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+OUTPUT_RATIO = 0.7  # 정제 결과는 원문(댓글 포함)보다 짧음
+OUTPUT_PER_POST = 80  # 번호, 키워드, 성향 등 형식에 드는 토큰
+MESSAGE_OVERHEAD = 4  # 메시지마다 역할/구분자에 드는 토큰
+
+_encodings = {}
+
+
+def count_tokens(text, model="gpt-4o"):
+    if tiktoken is None:
+        return len(text)
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Azure 배포 이름이 모델 이름과 다르면 gpt-4o 계열 인코딩 사용
+            _encodings[model] = tiktoken.get_encoding("o200k_base")
+    return len(_encodings[model].encode(text))
+
+
+def estimate_output_tokens(input_tokens):
+    return int(input_tokens * OUTPUT_RATIO) + OUTPUT_PER_POST
+
+
+def estimate_request_tokens(resource, request, model="gpt-4o"):
+    # 임베딩은 입력 토큰만, 채팅은 입력 + max_tokens (없으면 입력 길이로 추정한 출력)
+    if resource == "embeddings":
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        return sum(count_tokens(text, model) for text in inputs)
+
+    input_tokens = sum(count_tokens(str(message.get("content") or ""), model) + MESSAGE_OVERHEAD
+                       for message in request.get("messages", []))
+    if request.get("functions"):
+        input_tokens += count_tokens(json.dumps(request["functions"], ensure_ascii=False), model)
+    max_tokens = request.get("max_tokens")
+    return input_tokens + (max_tokens if max_tokens else estimate_output_tokens(input_tokens))
+
+
+def pack_batches(post_tokens, max_input_tokens, max_output_tokens, max_posts=None):
+    # 반환값은 (시작, 끝) 구간 목록, 예산보다 큰 게시글 하나는 단독 배치
+    batches = []
+    start = 0
+    used_input = used_output = 0
+    for idx, tokens in enumerate(post_tokens):
+        output_tokens = estimate_output_tokens(tokens)
+        full = (used_input + tokens > max_input_tokens
+                or used_output + output_tokens > max_output_tokens
+                or (max_posts is not None and idx - start >= max_posts))
+        if full and idx > start:
+            batches.append((start, idx))
+            start = idx
+            used_input = used_output = 0
+        used_input += tokens
+        used_output += output_tokens
+    if start < len(post_tokens):
+        batches.append((start, len(post_tokens)))
+    return batches
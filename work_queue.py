@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import time
+
+'''
+SQLite 기반 샤드 작업 큐 (lease + heartbeat)
+- talkNo 범위(또는 목록 페이지 범위)를 샤드로 나눠 저장
+- 워커는 claim() 으로 샤드 하나를 lease_seconds 동안 빌리고, 작업 중 heartbeat() 로 연장
+- lease 가 만료된 샤드는 다른 워커가 다시 가져감
+- heartbeat() 가 False 를 돌려주면 lease 를 잃은 것이므로 그 샤드 작업을 즉시 중단 (같은 게시글 중복 요청 방지)
+- MAX_ATTEMPTS 번 가져가고도 끝나지 않은 샤드는 failed 로 표시해 더 이상 나눠주지 않음 (retry_failed() 로 되살림)
+- 여러 호스트에서 쓰려면 SQLite 잠금을 지원하는 공유 파일시스템에 큐 파일을 두어야 함
+'''
+
+QUEUE_FILE = os.path.join("crawling_result", "work_queue.sqlite")
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 5
+
+
+class WorkQueue:
+    def __init__(self, path=QUEUE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS shards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                stop INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (kind, start, stop)
+            )""")
+
+    def create_shards(self, kind, start, stop, shard_size):
+        # talk: start(최신) 부터 stop(포함 안 함)까지 내림차순, page: start 부터 stop(포함) 까지 오름차순
+        if kind == "talk":
+            bounds = [(s, max(s - shard_size, stop)) for s in range(start, stop, -shard_size)]
+        else:
+            bounds = [(s, min(s + shard_size - 1, stop)) for s in range(start, stop + 1, shard_size)]
+        self._db.executemany("INSERT OR IGNORE INTO shards (kind, start, stop) VALUES (?, ?, ?)",
+                             [(kind, s, e) for s, e in bounds])
+        return len(bounds)
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        # 대기 중이거나 lease 가 만료된 샤드 하나를 원자적으로 가져옴
+        # 시도가 적은 샤드부터 나눠줘서 자꾸 실패하는 샤드가 다른 샤드를 막지 않게 함
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            # 워커가 죽어서 lease 가 만료된 것도 시도로 셈
+            self._db.execute(
+                "UPDATE shards SET status = 'failed', owner = NULL, lease_expires = NULL "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?", (now, MAX_ATTEMPTS))
+            row = self._db.execute(
+                "SELECT id, kind, start, stop, attempts FROM shards "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY attempts, id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                self._db.execute("COMMIT")
+                return None
+            self._db.execute(
+                "UPDATE shards SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + lease_seconds, row[0]))
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return dict(zip(("id", "kind", "start", "stop", "attempts"), row))
+
+    def heartbeat(self, shard_id, worker_id, lease_seconds=LEASE_SECONDS):
+        cursor = self._db.execute(
+            "UPDATE shards SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, shard_id, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, shard_id, worker_id):
+        cursor = self._db.execute(
+            "UPDATE shards SET status = 'done', lease_expires = NULL WHERE id = ? AND owner = ? AND status = 'leased'",
+            (shard_id, worker_id))
+        return cursor.rowcount == 1
+
+    def release(self, shard_id, worker_id):
+        # 실패한 샤드를 바로 다른 워커가 가져갈 수 있도록 반납, 시도 횟수를 다 썼으면 failed 로 표시하고 True 반환
+        self._db.execute(
+            "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, lease_expires = NULL WHERE id = ? AND owner = ? AND status = 'leased'",
+            (MAX_ATTEMPTS, shard_id, worker_id))
+        row = self._db.execute("SELECT status FROM shards WHERE id = ?", (shard_id,)).fetchone()
+        return row is not None and row[0] == 'failed'
+
+    def failed_shards(self):
+        return self._db.execute(
+            "SELECT id, kind, start, stop, attempts FROM shards WHERE status = 'failed' ORDER BY id").fetchall()
+
+    def retry_failed(self):
+        return self._db.execute(
+            "UPDATE shards SET status = 'pending', attempts = 0 WHERE status = 'failed'").rowcount
+
+    def done_shards(self, kind):
+        return self._db.execute(
+            "SELECT id, start, stop FROM shards WHERE kind = ? AND status = 'done' ORDER BY id", (kind,)).fetchall()
+
+    def stats(self):
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+
+    def close(self):
+        self._db.close()